@@ -111,6 +111,7 @@ class FileAdmin(ModelView, model=File):
         File.filename,
         File.filepath,
         File.uploaded_at,
+        File.blob_sha256,
         File.is_deleted,
     ]
 
@@ -7,3 +7,28 @@ class ApplicationStatus(Enum):
     RECEIVED = "RECEIVED"
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
+
+
+# statuses an application may move to from each status; anything else is
+# refused by the batch transition endpoint
+ALLOWED_STATUS_TRANSITIONS = {
+    ApplicationStatus.SENT: {
+        ApplicationStatus.PENDING,
+        ApplicationStatus.RECEIVED,
+        ApplicationStatus.APPROVED,
+        ApplicationStatus.REJECTED,
+    },
+    ApplicationStatus.PENDING: {
+        ApplicationStatus.RECEIVED,
+        ApplicationStatus.APPROVED,
+        ApplicationStatus.REJECTED,
+    },
+    ApplicationStatus.RECEIVED: {
+        ApplicationStatus.PENDING,
+        ApplicationStatus.APPROVED,
+        ApplicationStatus.REJECTED,
+    },
+    # decisions can only be reopened for review
+    ApplicationStatus.APPROVED: {ApplicationStatus.PENDING},
+    ApplicationStatus.REJECTED: {ApplicationStatus.PENDING},
+}
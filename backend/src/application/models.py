@@ -1,5 +1,5 @@
 from database.core import Base
-from sqlalchemy import Enum, ForeignKey, Integer
+from sqlalchemy import Enum, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .enums import ApplicationStatus
@@ -7,6 +7,16 @@ from .enums import ApplicationStatus
 
 class Application(Base):
     __tablename__ = "application"
+    __table_args__ = (
+        # the admin queue filters on status, hides deleted rows and ranges
+        # over submission dates
+        Index(
+            "ix_application_status_deleted_created",
+            "status",
+            "is_deleted",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     status: Mapped[ApplicationStatus] = mapped_column(
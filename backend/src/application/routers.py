@@ -1,24 +1,31 @@
 import logging
 from typing import Annotated, List  # noqa: F401
 
+from auth.schemas import Principal
 from auth.services import admin_access
-from auth.utils import get_current_user
-from core.models import User
+from auth.utils import get_current_principal
+from core.pagination import PageParams
 from database.core import get_async_db
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from subject.models import Subject  # noqa: F401
 
 from .enums import ApplicationStatus
-from .models import Application
-from .schemas import ApplicationCreate, ApplicationResponse
+from .schemas import (
+    ApplicationCreate,
+    ApplicationPage,
+    ApplicationResponse,
+    ApplicationStatusBatch,
+)
 from .services import (
     get_application_by_id,
+    get_filtered_applications,
     remove_application_by_id,
     send_application,
     update_application_status,
+    update_application_statuses,
 )
+from .utils import ApplicationFilters
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +34,7 @@ application_router = APIRouter(prefix="/application", tags=["Applications"])
 
 @application_router.post("/", summary="send an application", operation_id="post_apply")
 async def apply(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     application_data: ApplicationCreate,
     db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
@@ -45,15 +52,36 @@ async def apply(
 @application_router.get(
     "/",
     summary="List applications",
-    # response_model=List[ApplicationResponse],
+    response_model=ApplicationPage,
     dependencies=[Depends(admin_access)],
     operation_id="get_applications",
 )
-async def get_applications(db: Annotated[AsyncSession, Depends(get_async_db)]):
-    applications = await db.execute(select(Application))
-    applications = applications.scalars().all()
+async def get_applications(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    filters: Annotated[ApplicationFilters, Depends()],
+):
+    return await get_filtered_applications(db=db, page=page, filters=filters)
 
-    return applications
+
+@application_router.patch(
+    "/batch-status",
+    summary="Move many applications to one status",
+    dependencies=[Depends(admin_access)],
+    operation_id="patch_batch_application_status",
+)
+async def batch_application_status(
+    batch: ApplicationStatusBatch,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    results = await update_application_statuses(
+        application_ids=batch.application_ids, status=batch.status, db=db
+    )
+    logger.info(
+        f"Moved {sum(r['outcome'] == 'updated' for r in results)} of "
+        f"{len(results)} applications to {batch.status.value}"
+    )
+    return {"results": results}
 
 
 @application_router.get(
@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from subject.schemas import SubjectResponse
 
 from .models import ApplicationStatus
 
@@ -16,9 +18,42 @@ class ApplicationUpdate(BaseModel):
     user_id: int
 
 
+class ApplicationStatusBatch(BaseModel):
+    application_ids: List[int] = Field(min_length=1)
+    status: ApplicationStatus
+
+
 class ApplicationResponse(BaseModel):
     id: int
     status: ApplicationStatus
     subjects_ids: List[int]
 
     model_config = ConfigDict(from_attributes=True, extra="allow")
+
+
+class ApplicantSummary(BaseModel):
+    id: int
+    first_name: str
+    last_name: Optional[str] = None
+    email: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApplicationListItem(BaseModel):
+    id: int
+    status: ApplicationStatus
+    applicant_id: int
+    created_at: datetime
+    updated_at: datetime
+    is_deleted: bool
+    applicant: ApplicantSummary
+    subjects: List[SubjectResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationListItem]
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
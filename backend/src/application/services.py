@@ -1,15 +1,19 @@
 from typing import List, Optional
 
+from auth.utils import invalidate_cached_user
 from core.enums import Role
 from core.models import User
+from core.pagination import PageParams, paginate
 from fastapi import HTTPException, status
-from sqlalchemy import and_, select
+from sqlalchemy import and_, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from subject.models import Subject
 
+from .enums import ALLOWED_STATUS_TRANSITIONS
 from .models import Application, ApplicationStatus
 from .schemas import ApplicationCreate, ApplicationUpdate
+from .utils import ApplicationFilters
 
 
 async def get_all_applications(db: AsyncSession) -> Optional[List[Application]]:
@@ -18,6 +22,32 @@ async def get_all_applications(db: AsyncSession) -> Optional[List[Application]]:
     return applications.scalars().all()
 
 
+async def get_filtered_applications(
+    db: AsyncSession, page: PageParams, filters: ApplicationFilters
+) -> dict:
+    query = select(Application)
+
+    if not filters.include_deleted:
+        query = query.where(Application.is_deleted.is_(False))
+    if filters.status is not None:
+        query = query.where(Application.status == filters.status)
+    if filters.created_from is not None:
+        query = query.where(Application.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(Application.created_at < filters.created_to)
+    if filters.applicant_name:
+        query = query.join(User, User.id == Application.applicant_id).where(
+            or_(
+                User.first_name.istartswith(filters.applicant_name, autoescape=True),
+                User.last_name.istartswith(filters.applicant_name, autoescape=True),
+            )
+        )
+    if filters.subject is not None:
+        query = query.where(Application.subjects.any(Subject.name == filters.subject))
+
+    return await paginate(db, query, Application.id, page)
+
+
 async def get_application_by_id(
     application_id: int, db: AsyncSession
 ) -> Optional[Application]:
@@ -74,6 +104,7 @@ async def send_application(
     # Add and commit the new application
     db.add(new_application)
     await db.commit()
+    invalidate_cached_user(user_id)
     await db.refresh(new_application)
 
     return new_application
@@ -92,6 +123,7 @@ async def update_application(
 
     db.add(application)
     await db.commit()
+    invalidate_cached_user(application.applicant_id)
     await db.refresh(application)
     return application
 
@@ -107,10 +139,97 @@ async def update_application_status(
     application.status = status
     db.add(application)
     await db.commit()
+    invalidate_cached_user(application.applicant_id)
     await db.refresh(application)
     return application
 
 
+async def _current_statuses(application_ids: List[int], db: AsyncSession) -> dict:
+    result = await db.execute(
+        select(Application.id, Application.status, Application.applicant_id).where(
+            Application.id.in_(application_ids), Application.is_deleted.is_(False)
+        )
+    )
+    return {row.id: row for row in result.all()}
+
+
+async def update_application_statuses(
+    application_ids: List[int], status: ApplicationStatus, db: AsyncSession
+) -> List[dict]:
+    """Move many applications to ``status`` with a single UPDATE.
+
+    Returns one ``{"id", "status", "outcome"}`` per distinct id, where outcome
+    is updated, unchanged, not_found or invalid_transition and status is the
+    application's status after the call.
+    """
+    application_ids = list(dict.fromkeys(application_ids))
+    current = await _current_statuses(application_ids, db)
+
+    sources = {
+        source
+        for source, targets in ALLOWED_STATUS_TRANSITIONS.items()
+        if status in targets
+    }
+    to_update = [
+        application_id
+        for application_id, row in current.items()
+        if row.status in sources
+    ]
+
+    updated = set()
+    if to_update:
+        # the status guard keeps a concurrent change from being overwritten
+        # with a transition that is no longer valid; RETURNING tells which
+        # rows it let through
+        result = await db.execute(
+            update(Application)
+            .where(Application.id.in_(to_update), Application.status.in_(sources))
+            .values(status=status)
+            .returning(Application.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(result.scalars().all())
+        await db.commit()
+        for application_id in updated:
+            invalidate_cached_user(current[application_id].applicant_id)
+
+        # the rest lost a race, report them as they are now
+        lost = [
+            application_id
+            for application_id in to_update
+            if application_id not in updated
+        ]
+        for application_id in lost:
+            current.pop(application_id)
+        if lost:
+            current.update(await _current_statuses(lost, db))
+
+    results = []
+    for application_id in application_ids:
+        row = current.get(application_id)
+        if row is None:
+            results.append(
+                {"id": application_id, "status": None, "outcome": "not_found"}
+            )
+        elif application_id in updated:
+            results.append(
+                {"id": application_id, "status": status, "outcome": "updated"}
+            )
+        elif row.status == status:
+            results.append(
+                {"id": application_id, "status": row.status, "outcome": "unchanged"}
+            )
+        else:
+            results.append(
+                {
+                    "id": application_id,
+                    "status": row.status,
+                    "outcome": "invalid_transition",
+                }
+            )
+    return results
+
+
 async def remove_application_by_id(
     application_id: int, db: AsyncSession
 ) -> Optional[Application]:
@@ -121,5 +240,6 @@ async def remove_application_by_id(
 
     application.is_deleted = True
     await db.commit()
+    invalidate_cached_user(application.applicant_id)
     await db.refresh(application)
     return application
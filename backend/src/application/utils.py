@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+from subject.enums import SubjectNames
+
+from .enums import ApplicationStatus
+
+
+class ApplicationFilters:
+    """Query parameters narrowing the admin application queue."""
+
+    def __init__(
+        self,
+        status: Optional[ApplicationStatus] = Query(
+            None, description="Only applications in this status"
+        ),
+        created_from: Optional[datetime] = Query(
+            None, description="Only applications submitted at or after this time"
+        ),
+        created_to: Optional[datetime] = Query(
+            None, description="Only applications submitted before this time"
+        ),
+        applicant_name: Optional[str] = Query(
+            None,
+            min_length=1,
+            description="Prefix of the applicant's first or last name",
+        ),
+        subject: Optional[SubjectNames] = Query(
+            None, description="Only applications including this subject"
+        ),
+        include_deleted: bool = Query(
+            False, description="Also list soft-deleted applications"
+        ),
+    ):
+        self.status = status
+        self.created_from = created_from
+        self.created_to = created_to
+        self.applicant_name = applicant_name
+        self.subject = subject
+        self.include_deleted = include_deleted
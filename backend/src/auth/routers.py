@@ -11,7 +11,12 @@ from .services import (
     create_login_response,
     create_user_account,
 )
-from .utils import generate_access_token, get_user, verify_password_hash
+from .utils import (
+    generate_access_token,
+    get_user,
+    invalidate_cached_user,
+    verify_and_update_password_hash,
+)
 
 # Create the router
 auth_router = APIRouter(tags=["Auth"])
@@ -53,13 +58,24 @@ async def login_for_access_token(
 ):
     user = await get_user(db_session=db_session, username=form_data.username)
 
-    if not user or not await verify_password_hash(form_data.password, user.password):
+    verified, new_hash = (
+        await verify_and_update_password_hash(form_data.password, user.password)
+        if user
+        else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if new_hash:
+        # stored hash used a different bcrypt cost, upgrade it now
+        user.password = new_hash
+        await db_session.commit()
+        invalidate_cached_user(user.id)
+
     access_token = await generate_access_token(data={"sub": user.email})
     return create_login_response(access_token)
 
@@ -1,3 +1,4 @@
+from core.enums import Role
 from pydantic import BaseModel
 
 
@@ -6,3 +7,18 @@ class TokenResponse(BaseModel):
     refresh_token: str
     token_type: str = "Bearer"
     expires_in: int
+
+
+class Principal:
+    """The authenticated caller: just the columns access checks read."""
+
+    __slots__ = ("id", "email", "role", "is_active")
+
+    def __init__(self, id: int, email: str, role: Role, is_active: bool):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.is_active = is_active
+
+    def __repr__(self):
+        return f"Principal(id={self.id!r}, email={self.email!r}, role={self.role!r})"
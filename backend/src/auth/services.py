@@ -11,11 +11,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .schemas import TokenResponse
+from .schemas import Principal, TokenResponse
 from .utils import (
     generate_access_token,
     generate_password_hash,
-    get_current_user,
+    get_current_principal,
     verify_password_hash,
 )
 
@@ -105,7 +105,7 @@ def create_login_response(access_token: str):
 
 
 async def admin_access(
-    request: Request, current_user: User = Depends(get_current_user)
+    request: Request, current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.role != Role.ADMIN:
         raise HTTPException(
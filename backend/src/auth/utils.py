@@ -1,12 +1,16 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 import jwt
+from core.cache import TTLCache
 from core.config import settings
 from core.enums import Role
 from core.models import User
 from database.core import get_async_db
 from fastapi import Cookie, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
 from passlib.context import CryptContext
@@ -14,16 +18,80 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .schemas import Principal
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    # hashes made with any other cost report needs_update, so login rehashes them
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Screens poll every few seconds with the same cookie, so decoded tokens and
+# the principals they resolve to are kept for a short while instead of being
+# decoded and looked up on every request. Only plain data is cached, never ORM
+# instances: those belong to the session of the request that loaded them.
+# Services that change a user call invalidate_cached_user so the next request
+# sees the new row.
+token_cache = TTLCache(
+    maxsize=settings.AUTH_IDENTITY_CACHE_SIZE,
+    ttl=settings.AUTH_IDENTITY_CACHE_TTL_SECONDS,
+)
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_IDENTITY_CACHE_SIZE,
+    ttl=settings.AUTH_IDENTITY_CACHE_TTL_SECONDS,
+)
+# user id -> token subject, so services that only know the id can invalidate
+_cached_subjects = TTLCache(
+    maxsize=settings.AUTH_IDENTITY_CACHE_SIZE,
+    ttl=settings.AUTH_IDENTITY_CACHE_TTL_SECONDS,
+)
+
+
+# bcrypt is deliberately slow, so it runs on a bounded thread pool instead of
+# the event loop; once every worker is busy and the queue is full, callers get
+# a 503 rather than piling up behind a login burst
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_slots = asyncio.Semaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+)
+
+
+async def _run_password_hashing(func, *args):
+    if _hash_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+
 
 async def generate_password_hash(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    return await _run_password_hashing(pwd_context.hash, plain_password)
 
 
 async def verify_password_hash(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_password_hashing(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_hash(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a fresh hash if the stored one is outdated."""
+    return await _run_password_hashing(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
 async def generate_access_token(
@@ -53,6 +121,30 @@ async def decode_token(token: str):
     return payload
 
 
+def decode_cached_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(
+        token,
+        settings.JWT_ACCESS_SECRET_KEY,
+        algorithms=[settings.ENCRYPTION_ALGORITHM],
+    )
+    ttl = settings.AUTH_IDENTITY_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        # never serve a payload past the token's own expiry
+        ttl = min(ttl, payload["exp"] - time.time())
+    token_cache.set(token, payload, ttl=ttl)
+    return payload
+
+
+def invalidate_cached_user(user_id: int):
+    subject = _cached_subjects.pop(user_id)
+    if subject is not None:
+        principal_cache.pop(subject)
+
+
 # User related stuff
 async def get_user(db_session: AsyncSession, username: str):
     query = (
@@ -64,9 +156,7 @@ async def get_user(db_session: AsyncSession, username: str):
     return result.unique().scalar_one_or_none()
 
 
-async def get_current_user(
-    db_session: AsyncSession = Depends(get_async_db), access_token: str = Cookie(None)
-):
+def get_token_subject(access_token: Optional[str]) -> str:
     if access_token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -82,31 +172,73 @@ async def get_current_user(
 
     try:
         token = access_token.split(" ")[1] if " " in access_token else access_token
-
-        payload = jwt.decode(
-            token,
-            settings.JWT_ACCESS_SECRET_KEY,
-            algorithms=[settings.ENCRYPTION_ALGORITHM],
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        user = await get_user(db_session, username)
-        if user is None:
-            raise credentials_exception
+        payload = decode_cached_token(token)
     except PyJWTError:
         raise credentials_exception
-    except jwt.ExpiredSignatureError:
-        return JSONResponse(
+
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+    return username
+
+
+async def get_current_user(
+    db_session: AsyncSession = Depends(get_async_db), access_token: str = Cookie(None)
+):
+    """Resolve the caller to a full User with its subjects and application.
+
+    Only endpoints that serialize the user (like /me) need this; access checks
+    should depend on get_current_principal instead.
+    """
+    username = get_token_subject(access_token)
+
+    # not cached: the full user with its relationships has to be loaded into
+    # this request's session anyway, the principal cache covers access checks
+    user = await get_user(db_session, username)
+    if user is None:
+        raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"detail": "Token has expired"},
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
     return user
 
 
+async def get_principal(db_session: AsyncSession, username: str):
+    query = select(User.id, User.email, User.role, User.is_active).where(
+        User.email == username
+    )
+    result = await db_session.execute(query)
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return Principal(id=row.id, email=row.email, role=row.role, is_active=row.is_active)
+
+
+async def get_current_principal(
+    db_session: AsyncSession = Depends(get_async_db), access_token: str = Cookie(None)
+) -> Principal:
+    """Resolve the caller to a Principal with one narrow column query at most."""
+    username = get_token_subject(access_token)
+
+    principal = principal_cache.get(username)
+    if principal is None:
+        principal = await get_principal(db_session, username)
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal_cache.set(username, principal)
+        _cached_subjects.set(principal.id, username)
+
+    return principal
+
+
 def role_required(required_role: Role):
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: Principal = Depends(get_current_principal)):
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions"
@@ -0,0 +1,56 @@
+from collections import defaultdict
+from typing import List
+
+from auth.utils import invalidate_cached_user
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .enums import Role
+from .models import User
+
+
+async def update_users_batch(
+    db: AsyncSession, role: Role, updates: List[BaseModel]
+) -> List[dict]:
+    """Apply many partial user updates with a fixed number of statements.
+
+    Every item carries an ``id`` plus the fields to change. The targets are
+    checked with one IN query and the changes go out as one executemany UPDATE
+    per distinct set of fields. Returns one ``{"id", "status"}`` per item with
+    status updated, unchanged, not_found or duplicate.
+    """
+    ids = [item.id for item in updates]
+    result = await db.execute(
+        select(User.id).where(
+            User.id.in_(ids), User.role == role, User.is_deleted.is_(False)
+        )
+    )
+    found = set(result.scalars().all())
+
+    # rows grouped by the fields they set, one UPDATE statement per group
+    groups = defaultdict(list)
+    results, seen = [], set()
+    for item in updates:
+        changes = item.model_dump(exclude_unset=True, exclude={"id"})
+        if item.id not in found:
+            outcome = "not_found"
+        elif item.id in seen:
+            outcome = "duplicate"
+        elif not changes:
+            outcome = "unchanged"
+        else:
+            outcome = "updated"
+            groups[tuple(sorted(changes))].append({"id": item.id, **changes})
+        seen.add(item.id)
+        results.append({"id": item.id, "status": outcome})
+
+    if groups:
+        for rows in groups.values():
+            await db.execute(update(User), rows)
+        await db.commit()
+        for rows in groups.values():
+            for row in rows:
+                invalidate_cached_user(row["id"])
+
+    return results
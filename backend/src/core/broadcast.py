@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import json
+import logging
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Set
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+
+from .config import settings
+from .enums import Role
+
+logger = logging.getLogger(__name__)
+
+# channels a client can subscribe to, with the roles allowed to (None: everyone)
+STREAM_CHANNELS = {
+    "messages": None,
+    "teacher_messages": {Role.ADMIN, Role.TEACHER},
+    "files": None,
+}
+
+
+def format_event(channel: str, data: Any, event_id: int) -> str:
+    return (
+        f"id: {event_id}\n"
+        f"event: {channel}\n"
+        f"data: {json.dumps(jsonable_encoder(data))}\n\n"
+    )
+
+
+class Subscription:
+    __slots__ = ("channels", "queue", "user_id", "role")
+
+    def __init__(
+        self,
+        channels: Iterable[str],
+        maxsize: int,
+        user_id: Optional[int] = None,
+        role: Optional[Role] = None,
+    ):
+        self.channels = frozenset(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.user_id = user_id
+        self.role = role
+
+    def wants(self, channel: str, recipient_id: Optional[int]) -> bool:
+        if channel not in self.channels:
+            return False
+        return (
+            recipient_id is None
+            or self.role == Role.ADMIN
+            or self.user_id == recipient_id
+        )
+
+
+class Broadcaster:
+    """Fans committed changes out to the open event streams of this process.
+
+    Each payload is encoded once at publish time and the same string is
+    queued for every interested subscriber. A subscriber that falls
+    ``queue_size`` events behind has its backlog dropped and gets a single
+    ``resync`` event instead, telling the client to refetch the list.
+    Events published for a ``recipient_id`` only reach that user and admins.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def publish(
+        self, channel: str, data: Any, recipient_id: Optional[int] = None
+    ) -> None:
+        subscribers = [s for s in self._subscriptions if s.wants(channel, recipient_id)]
+        if not subscribers:
+            return
+
+        event = format_event(channel, data, next(self._ids))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(
+                    format_event("resync", {"channel": channel}, next(self._ids))
+                )
+
+    @contextmanager
+    def subscribe(
+        self,
+        channels: Iterable[str],
+        user_id: Optional[int] = None,
+        role: Optional[Role] = None,
+    ) -> Iterator[asyncio.Queue]:
+        subscription = Subscription(channels, self.queue_size, user_id, role)
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription.queue
+        finally:
+            self._subscriptions.discard(subscription)
+
+    async def stream(
+        self,
+        request: Request,
+        channels: Iterable[str],
+        user_id: Optional[int] = None,
+        role: Optional[Role] = None,
+    ) -> AsyncIterator[str]:
+        """Server-sent events for ``channels`` until the client goes away."""
+        heartbeat = float(settings.STREAM_HEARTBEAT_SECONDS)
+        with self.subscribe(channels, user_id, role) as queue:
+            # flush the headers right away so the client knows it is subscribed
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # comment lines keep proxies from closing an idle stream
+                    event = ": ping\n\n"
+                yield event
+
+
+broadcaster = Broadcaster(queue_size=int(settings.STREAM_QUEUE_SIZE))
@@ -0,0 +1,209 @@
+import functools
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from enum import Enum
+from typing import Any, Hashable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """A small in-process LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._entries.clear()
+
+    def keys(self):
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend:
+    """Interface for response caches. Values must be JSON-serializable."""
+
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        raise NotImplementedError
+
+    async def invalidate(self, namespace: str):
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any:
+        value = self._cache.get(key)
+        # hand out a copy so callers cannot mutate the cached value
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self._cache.set(key, json.dumps(value), ttl=ttl)
+
+    async def invalidate(self, namespace: str):
+        prefix = f"{namespace}:"
+        for key in self._cache.keys():
+            if key.startswith(prefix):
+                self._cache.pop(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis (or any Redis-compatible server) backed cache.
+
+    Errors talking to Redis are logged and treated as cache misses, so an
+    unavailable cache slows requests down instead of failing them.
+    """
+
+    def __init__(self, client, ttl: int, key_prefix: str = "response-cache"):
+        self.client = client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    async def get(self, key: str) -> Any:
+        try:
+            value = await self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        try:
+            await self.client.set(self._key(key), json.dumps(value), ex=ttl or self.ttl)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def invalidate(self, namespace: str):
+        try:
+            keys = [
+                key async for key in self.client.scan_iter(self._key(f"{namespace}:*"))
+            ]
+            if keys:
+                await self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Redis cache invalidation of {namespace} failed: {e}")
+
+
+def build_cache_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            logger.warning("redis is not installed, using the in-memory cache")
+        else:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=int(settings.REDIS_PORT),
+                password=settings.REDIS_PASSWORD,
+                db=settings.REDIS_DB,
+                socket_timeout=1,
+                socket_connect_timeout=1,
+            )
+            return RedisCacheBackend(
+                client, ttl=settings.REDIS_CACHE_EXPIRATION_SECONDS
+            )
+
+    return InMemoryCacheBackend(
+        maxsize=settings.CACHE_MAX_ENTRIES,
+        ttl=settings.CACHE_MEMORY_TTL_SECONDS,
+    )
+
+
+response_cache = build_cache_backend()
+
+# change feeds and keyset pages differ per client and position; caching them
+# would only fill the cache with entries that are never asked for again
+_UNCACHED_PARAMS = ("since", "cursor")
+
+
+def _cache_key(namespace: str, kwargs: dict) -> str:
+    # only plain values identify a response; sessions and principals are skipped
+    parts = [
+        f"{name}={value.value if isinstance(value, Enum) else value}"
+        for name, value in sorted(kwargs.items())
+        if isinstance(value, (str, int, float, bool, Enum, date, type(None)))
+    ]
+    return f"{namespace}:{'&'.join(parts)}"
+
+
+def cache_response(namespace: str, ttl: Optional[int] = None):
+    """Cache a read-only endpoint's JSON output under ``namespace``.
+
+    The key is built from the endpoint's plain (path/query) arguments, so this
+    must only wrap endpoints whose output is the same for every caller. Write
+    paths call ``response_cache.invalidate(namespace)`` after they commit.
+    Requests with a ``since`` or ``cursor`` are passed straight through.
+    """
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if not settings.REDIS_CACHE_ENABLED or any(
+                kwargs.get(name) is not None for name in _UNCACHED_PARAMS
+            ):
+                return await endpoint(*args, **kwargs)
+
+            key = _cache_key(namespace, kwargs)
+            cached = await response_cache.get(key)
+            if cached is not None:
+                return cached
+
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+
+            encoded = jsonable_encoder(result)
+            await response_cache.set(key, encoded, ttl=ttl)
+            return encoded
+
+        return wrapper
+
+    return decorator
@@ -4,6 +4,7 @@ from os import path
 from random import randint
 from urllib import parse
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,7 +18,7 @@ class GlobalSettings(BaseSettings):
     )
 
     #################################### logging ####################################
-    LOG_LEVEL: int = os.getenv("LOG_LEVEL", logging.DEBUG)
+    LOG_LEVEL: int = os.getenv("LOG_LEVEL", logging.INFO)
     #################################### logging ####################################
 
     #################################### sentry ####################################
@@ -34,6 +35,8 @@ class GlobalSettings(BaseSettings):
     #################################### static files ####################################
 
     #################################### DATABASE RELATED ####################################
+    # "sqlite" for a single-file database, "postgresql" for the asyncpg backend
+    DATABASE_BACKEND: str = os.getenv("DATABASE_BACKEND", "sqlite")
     DATABASE_USER: str = os.getenv("DATABASE_USER", "uncle_k8ith")
     DATABASE_PASSWORD: str = os.getenv("DATABASE_PASSWORD", "05Chloeee")
     DATABASE_HOST: str = os.getenv("DATABASE_HOST", "localhost")
@@ -42,13 +45,34 @@ class GlobalSettings(BaseSettings):
     DATABASE_SCHEMA: str = os.getenv("DATABASE_SCHEMA", "KSMS")
     DATABASE_ENGINE_POOL_SIZE: int = os.getenv("DATABASE_ENGINE_POOL_SIZE", 20)
     DATABASE_ENGINE_MAX_OVERFLOW: int = os.getenv("DATABASE_ENGINE_MAX_OVERFLOW", 0)
+    # seconds a request may wait for a free pooled connection before failing
+    DATABASE_ENGINE_POOL_TIMEOUT: int = os.getenv("DATABASE_ENGINE_POOL_TIMEOUT", 30)
     # Deal with DB disconnects
     # https://docs.sqlalchemy.org/en/20/core/pooling.html#pool-disconnects
     DATABASE_ENGINE_POOL_PING: bool = os.getenv("DATABASE_ENGINE_POOL_PING", False)
+    # SQLite performance profile, applied to every new connection
+    DATABASE_SQLITE_JOURNAL_MODE: str = os.getenv("DATABASE_SQLITE_JOURNAL_MODE", "WAL")
+    DATABASE_SQLITE_SYNCHRONOUS: str = os.getenv(
+        "DATABASE_SQLITE_SYNCHRONOUS", "NORMAL"
+    )
+    DATABASE_SQLITE_MMAP_SIZE: int = os.getenv(
+        "DATABASE_SQLITE_MMAP_SIZE", 256 * 1024 * 1024
+    )
+    # negative values are KiB, so this is a 64MB page cache per connection
+    DATABASE_SQLITE_CACHE_SIZE: int = os.getenv("DATABASE_SQLITE_CACHE_SIZE", -64000)
+    DATABASE_SQLITE_BUSY_TIMEOUT_MS: int = os.getenv(
+        "DATABASE_SQLITE_BUSY_TIMEOUT_MS", 5000
+    )
+    # queue writers in-process instead of letting them fight over the file lock
+    DATABASE_SQLITE_WRITE_QUEUE: bool = os.getenv("DATABASE_SQLITE_WRITE_QUEUE", True)
     # this will support special chars for credentials
     _QUOTED_DATABASE_PASSWORD: str = parse.quote(str(DATABASE_PASSWORD))
-    # specify a single database URL
-    DATABASE_URL: str = "sqlite+aiosqlite:///./KSMS.db"
+    # specify a single database URL, or leave it empty to build one from
+    # DATABASE_BACKEND and the credentials above
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    SQLITE_DATABASE_URL: str = os.getenv(
+        "SQLITE_DATABASE_URL", "sqlite+aiosqlite:///./KSMS.db"
+    )
     # DATABASE_URL: str = f"sqlite:///./backend/src/database/{DATABASE_NAME}.db"
     ############## redis for caching ################
     REDIS_CACHE_ENABLED: bool = os.getenv("REDIS_CACHE_ENABLED", True)
@@ -59,9 +83,77 @@ class GlobalSettings(BaseSettings):
         "REDIS_CACHE_EXPIRATION_SECONDS", 60 * 30
     )
     REDIS_DB: int = os.getenv("REDIS_DB", 0)
+    # "memory" keeps an LRU per process, "redis" shares one cache between workers
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES: int = os.getenv("CACHE_MAX_ENTRIES", 1024)
+    # the memory cache never hears of other workers' writes, so its entries
+    # only live long enough to absorb bursts of identical requests
+    CACHE_MEMORY_TTL_SECONDS: int = os.getenv("CACHE_MEMORY_TTL_SECONDS", 5)
     ############## redis for caching ###############
     #################################### DATABASE RELATED ####################################
 
+    #################################### pagination ####################################
+    PAGINATION_DEFAULT_LIMIT: int = os.getenv("PAGINATION_DEFAULT_LIMIT", 50)
+    PAGINATION_MAX_LIMIT: int = os.getenv("PAGINATION_MAX_LIMIT", 200)
+    #################################### pagination ####################################
+
+    #################################### subjects ####################################
+    # full reload of the in-process subject registry, picks up changes made by
+    # other workers; 0 disables the periodic reload
+    SUBJECT_REGISTRY_REFRESH_SECONDS: int = os.getenv(
+        "SUBJECT_REGISTRY_REFRESH_SECONDS", 300
+    )
+    #################################### subjects ####################################
+
+    #################################### streaming ####################################
+    # seconds between keep-alive comments on an idle /stream connection
+    STREAM_HEARTBEAT_SECONDS: int = os.getenv("STREAM_HEARTBEAT_SECONDS", 15)
+    # events buffered per subscriber before it is told to resync instead
+    STREAM_QUEUE_SIZE: int = os.getenv("STREAM_QUEUE_SIZE", 100)
+    #################################### streaming ####################################
+
+    #################################### sync ####################################
+    # how far before the client's "since" cursor a sync starts looking
+    SYNC_OVERLAP_SECONDS: int = os.getenv("SYNC_OVERLAP_SECONDS", 2)
+    #################################### sync ####################################
+
+    #################################### uploads ####################################
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    UPLOAD_MAX_BYTES: int = os.getenv("UPLOAD_MAX_BYTES", 500 * 1024 * 1024)
+    # uploads are copied and hashed this many bytes at a time
+    UPLOAD_CHUNK_SIZE: int = os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+    # unfinished resumable uploads idle for longer than this are discarded
+    UPLOAD_SESSION_TTL_SECONDS: int = os.getenv(
+        "UPLOAD_SESSION_TTL_SECONDS", 24 * 60 * 60
+    )
+    # thumbnails: longest side in pixels and JPEG quality
+    THUMBNAIL_SIZE: int = os.getenv("THUMBNAIL_SIZE", 256)
+    THUMBNAIL_QUALITY: int = os.getenv("THUMBNAIL_QUALITY", 80)
+    # a video poster frame that takes longer than this is given up on
+    THUMBNAIL_TIMEOUT_SECONDS: int = os.getenv("THUMBNAIL_TIMEOUT_SECONDS", 30)
+    #################################### uploads ####################################
+
+    #################################### tasks ####################################
+    TASK_WORKERS: int = os.getenv("TASK_WORKERS", 4)
+    # a failing task is retried this often, waiting base * 2**n seconds in between
+    TASK_MAX_RETRIES: int = os.getenv("TASK_MAX_RETRIES", 3)
+    TASK_RETRY_BASE_SECONDS: float = os.getenv("TASK_RETRY_BASE_SECONDS", 1)
+    # how long shutdown waits for queued tasks to finish
+    TASK_DRAIN_SECONDS: int = os.getenv("TASK_DRAIN_SECONDS", 10)
+    # keep queued tasks in a SQLite file so they survive restarts
+    TASK_QUEUE_PERSIST: bool = os.getenv("TASK_QUEUE_PERSIST", False)
+    TASK_QUEUE_DB_PATH: str = os.getenv("TASK_QUEUE_DB_PATH", "./tasks.db")
+    #################################### tasks ####################################
+
+    #################################### metrics ####################################
+    # per-route latency, size and status metrics, served at /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", True)
+    # when set, /metrics wants "Authorization: Bearer <token>"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    # one timing line per request on the core.metrics logger
+    METRICS_LOG_REQUESTS: bool = os.getenv("METRICS_LOG_REQUESTS", True)
+    #################################### metrics ####################################
+
     #################################### auth related ####################################
     JWT_ACCESS_SECRET_KEY: str = os.getenv(
         "JWT_ACCESS_SECRET_KEY", "9d9bc4d77ac3a6fce1869ec8222729d2"
@@ -74,6 +166,17 @@ class GlobalSettings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int = os.getenv(
         "REFRESH_TOKEN_EXPIRE_MINUTES", 60 * 24
     )
+    # bcrypt work factor; stored hashes with a different cost are rehashed on login
+    PASSWORD_BCRYPT_ROUNDS: int = os.getenv("PASSWORD_BCRYPT_ROUNDS", 12)
+    # password hashing runs on this many worker threads, off the event loop
+    PASSWORD_HASH_WORKERS: int = os.getenv("PASSWORD_HASH_WORKERS", 4)
+    # hashing requests allowed to wait for a worker before we answer 503
+    PASSWORD_HASH_QUEUE_LIMIT: int = os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64)
+    # decoded tokens and resolved users are cached per process for this long
+    AUTH_IDENTITY_CACHE_TTL_SECONDS: int = os.getenv(
+        "AUTH_IDENTITY_CACHE_TTL_SECONDS", 30
+    )
+    AUTH_IDENTITY_CACHE_SIZE: int = os.getenv("AUTH_IDENTITY_CACHE_SIZE", 1024)
     # Google Auth
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
@@ -99,6 +202,26 @@ class GlobalSettings(BaseSettings):
     )
     #################################### admin ####################################
 
+    @model_validator(mode="after")
+    def assemble_database_url(self):
+        if self.DATABASE_URL:
+            return self
+
+        if self.DATABASE_BACKEND == "postgresql":
+            password = parse.quote(str(self.DATABASE_PASSWORD))
+            self.DATABASE_URL = (
+                f"postgresql+asyncpg://{self.DATABASE_USER}:{password}"
+                f"@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
+            )
+        elif self.DATABASE_BACKEND == "sqlite":
+            self.DATABASE_URL = self.SQLITE_DATABASE_URL
+        else:
+            raise ValueError(
+                f"Unsupported DATABASE_BACKEND {self.DATABASE_BACKEND!r}, "
+                "expected 'sqlite' or 'postgresql'"
+            )
+        return self
+
 
 class TestSettings(GlobalSettings):
     DATABASE_SCHEMA: str = f"test_{randint(1, 100)}"
@@ -148,10 +271,9 @@ LOGGING_CONFIG: dict = {
     },
     "loggers": {
         "": {"handlers": ["default"], "level": settings.LOG_LEVEL, "propagate": False},
-        "uvicorn": {
-            "handlers": ["default"],
-            "level": logging.ERROR,
-            "propagate": False,
-        },
+        # aiosqlite logs every statement at DEBUG
+        "aiosqlite": {"level": logging.INFO},
+        # SQLAlchemy's pool echo logs every checkout, checkin and reset
+        "database.core.TimedQueuePool": {"level": logging.WARNING},
     },
 }
@@ -32,3 +32,8 @@ class TeacherEducationLevel(PyEnum):
     DEGREE = "DEGREE"
     MASTERS = "MASTERS"  # assigned to distinguish admin users as they cannot be assigned an academic Level
     PHD = "PHD"  # assigned to distinguish admin users as they cannot be assigned an academic Level
+
+
+class SortOrder(PyEnum):
+    ASC = "asc"
+    DESC = "desc"
@@ -0,0 +1,133 @@
+import functools
+import hashlib
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Mapping, Optional
+
+from application.models import Application
+from core.associations import UserSubjectAssociation
+from core.models import User
+from fastapi import Response
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from subject.models import Subject
+
+
+def _rows_state(model, key, *criteria):
+    """Latest ``updated_at``, row count and highest key of the matching rows.
+
+    The count catches deletions and the key catches a row replaced by another
+    within the resolution of ``updated_at``.
+    """
+    return (
+        select(
+            literal(model.__tablename__),
+            func.max(model.updated_at),
+            func.count(),
+            func.max(key),
+        )
+        .select_from(model)
+        .where(*criteria)
+    )
+
+
+async def user_version(db: AsyncSession, user_id: int) -> str:
+    """Version of everything served about one user: the user row, its subject
+    enrollments, its application and the application's subjects.
+
+    Read from the database, so writes from other workers and the admin panel
+    are seen as well.
+    """
+    application_ids = select(Application.id).where(Application.applicant_id == user_id)
+    result = await db.execute(
+        union_all(
+            _rows_state(User, User.id, User.id == user_id),
+            _rows_state(
+                UserSubjectAssociation,
+                UserSubjectAssociation.subject_id,
+                UserSubjectAssociation.user_id == user_id,
+            ),
+            _rows_state(
+                Application, Application.id, Application.applicant_id == user_id
+            ),
+            _rows_state(
+                Subject, Subject.id, Subject.application_id.in_(application_ids)
+            ),
+        )
+    )
+    states = ";".join(":".join(map(str, row)) for row in sorted(result.all()))
+    return f"user:{user_id}:{states}"
+
+
+async def table_version(db: AsyncSession, model, *criteria) -> str:
+    """Latest ``updated_at``, row count and highest id: changes on every write
+    to the rows, even several within one tick of the clock.
+    """
+    result = await db.execute(_rows_state(model, model.id, *criteria))
+    return ":".join(map(str, result.one()))
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    # weak comparison, RFC 9110 13.1.2
+    opaque = tag.removeprefix("W/")
+    return any(
+        candidate.strip() == "*" or candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def is_not_modified(
+    request_headers: Mapping[str, str], response_headers: Mapping[str, str]
+) -> bool:
+    """Whether the client's copy is still current, for responses that already
+    carry ETag / Last-Modified (files). If-None-Match wins over
+    If-Modified-Since, as RFC 9110 asks.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _matches(if_none_match, response_headers.get("etag", ""))
+
+    if_modified_since = request_headers.get("if-modified-since")
+    last_modified = response_headers.get("last-modified")
+    if not (if_modified_since and last_modified):
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(
+            last_modified
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def conditional_response(version: Callable[..., Awaitable[str]]):
+    """Answer ``If-None-Match`` with 304 Not Modified before the endpoint runs.
+
+    ``version`` receives the endpoint's keyword arguments and returns a cheap
+    string that changes whenever the response would. The endpoint must take
+    ``request: Request`` and ``response: Response``. Stack it above
+    ``cache_response`` so cache hits carry the ETag as well.
+    """
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request, response = kwargs["request"], kwargs["response"]
+
+            state = await version(**kwargs)
+            # the query string selects the variant (page, since, fields...)
+            digest = hashlib.blake2b(
+                f"{state}?{request.url.query}".encode(), digest_size=12
+            ).hexdigest()
+            tag = f'W/"{digest}"'
+
+            headers = {"ETag": tag, "Cache-Control": "no-cache"}
+            if _matches(request.headers.get("if-none-match"), tag):
+                return Response(status_code=304, headers=headers)
+
+            response.headers.update(headers)
+            return await endpoint(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,190 @@
+"""Per-route request metrics in the Prometheus text format.
+
+MetricsMiddleware times every HTTP request and records, per method and route
+template: a latency histogram, a response size histogram and a counter per
+status code, plus the number of requests in flight. ``/metrics`` renders them
+(see core/routers.py). Values live in process memory, so with several
+workers each one reports its own and the scraper adds them up.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# requests that matched no route (404 probes, mounted apps) share one label so
+# scanners cannot blow up the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name, self.documentation = name, documentation
+        self.values: Dict[Labels, float] = defaultdict(int)
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels, amount: float = 1) -> None:
+        self.values[labels] -= amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float]):
+        self.name, self.documentation = name, documentation
+        self.buckets = tuple(buckets)
+        # per label set: one count per bucket plus +Inf, then the sum
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels((*labels, ("le", str(bound))))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests by route and status code."
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "Time from request start to the last response byte.",
+            LATENCY_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size.", SIZE_BUCKETS
+        )
+        self.in_progress = Gauge(
+            "http_requests_in_progress", "HTTP requests being handled right now."
+        )
+
+    def observe(
+        self, method: str, route: str, status: int, duration: float, size: int
+    ) -> None:
+        labels = (("method", method), ("route", route))
+        self.requests.inc((*labels, ("status", str(status))))
+        self.latency.observe(labels, duration)
+        self.response_size.observe(labels, size)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.requests,
+            self.latency,
+            self.response_size,
+            self.in_progress,
+        ):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def _route_template(scope: Scope) -> str:
+    # FastAPI leaves the matched route in the scope once routing is done
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI, so streamed responses (/stream, downloads) pass untouched."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = (("method", method),)
+        # an exception that escapes the app becomes a 500 further out
+        status, size, content_length = 500, 0, 0
+        start = time.perf_counter()
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size, content_length
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-length":
+                        content_length = int(value)
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.pathsend":
+                # the server sends the file itself, the header has its size
+                size += content_length
+            await send(message)
+
+        request_metrics.in_progress.inc(in_progress)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - start
+            request_metrics.in_progress.dec(in_progress)
+            route = _route_template(scope)
+            request_metrics.observe(method, route, status, duration, size)
+            if settings.METRICS_LOG_REQUESTS:
+                logger.info(
+                    f"method={method} route={route} path={scope['path']} "
+                    f"status={status} duration_ms={duration * 1000:.1f} bytes={size}"
+                )
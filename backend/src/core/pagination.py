@@ -0,0 +1,84 @@
+from typing import Any, Optional
+
+from fastapi import Query
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .enums import SortOrder
+
+
+class PageParams:
+    """Keyset pagination query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        cursor: Optional[int] = Query(
+            None, description="Return rows after this id (next_cursor of the last page)"
+        ),
+        limit: int = Query(
+            settings.PAGINATION_DEFAULT_LIMIT,
+            ge=1,
+            le=settings.PAGINATION_MAX_LIMIT,
+            description="Maximum number of rows in the page",
+        ),
+        include_total: bool = Query(
+            False, description="Also count every row matching the filters"
+        ),
+        order: SortOrder = Query(
+            SortOrder.ASC, description="Oldest (asc) or newest (desc) rows first"
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.include_total = include_total
+        self.order = order
+
+
+def _row_id(row: Any) -> int:
+    return row["id"] if isinstance(row, dict) else row.id
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    id_column,
+    page: PageParams,
+    as_mappings: bool = False,
+) -> dict:
+    """Run ``query`` one keyset page at a time, ordered by ``id_column``.
+
+    Rows are fetched with ``id > cursor ORDER BY id LIMIT limit + 1`` (or
+    ``id < cursor ORDER BY id DESC`` for descending pages), so the cost of a
+    page does not depend on how deep into the table it is. The extra row only
+    tells us whether a next page exists.
+    """
+    total = None
+    if page.include_total:
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        total = await db.scalar(count_query)
+
+    if page.order == SortOrder.DESC:
+        if page.cursor is not None:
+            query = query.where(id_column < page.cursor)
+        query = query.order_by(id_column.desc())
+    else:
+        if page.cursor is not None:
+            query = query.where(id_column > page.cursor)
+        query = query.order_by(id_column)
+    query = query.limit(page.limit + 1)
+
+    result = await db.execute(query)
+    rows = (
+        [dict(row) for row in result.mappings()]
+        if as_mappings
+        else result.scalars().all()
+    )
+
+    has_more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    return {
+        "items": rows,
+        "next_cursor": _row_id(rows[-1]) if has_more else None,
+        "total": total,
+    }
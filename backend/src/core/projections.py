@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, Query, status
+
+from .models import User
+
+# User columns a list view may ask for. The password hash and relationships
+# are deliberately not listable.
+USER_LIST_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "id_number",
+    "gender",
+    "date_of_birth",
+    "number_of_passed_subjects",
+    "previous_school",
+    "next_of_kin",
+    "current_academic_level",
+    "role",
+    "is_active",
+    "is_verified",
+    "is_deleted",
+    "teaching_subject",
+    "teacher_id_number",
+    "teacher_gender",
+    "teacher_next_of_kin",
+    "teacher_current_academic_level",
+    "is_checked_out",
+    "last_checked_in",
+    "last_checked_out",
+    "created_at",
+    "updated_at",
+)
+# what the admin users and staff screens display
+DEFAULT_USER_LIST_FIELDS = ("id", "first_name", "last_name", "email", "phone_number")
+
+
+def get_user_list_columns(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma separated user columns to return, "
+        f"defaults to {','.join(DEFAULT_USER_LIST_FIELDS)}",
+    ),
+) -> List:
+    names = (
+        [name.strip() for name in fields.split(",") if name.strip()]
+        if fields
+        else list(DEFAULT_USER_LIST_FIELDS)
+    )
+
+    unknown = [name for name in names if name not in USER_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown or unlisted fields: {', '.join(unknown)}",
+        )
+
+    # the id is the pagination cursor, so it is always selected
+    if "id" not in names:
+        names.insert(0, "id")
+    return [getattr(User, name) for name in dict.fromkeys(names)]
@@ -1,13 +1,20 @@
 import logging
+import secrets
 from typing import Annotated
 
+from auth.schemas import Principal
 from auth.services import admin_access, password_reset
-from auth.utils import get_current_user
-from database.core import get_async_db
+from auth.utils import get_current_principal, get_current_user
+from database.core import get_async_db, get_pool_status
 
 # core_router.py
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from student.services import set_student_account_status
 from teacher.schemas import (
@@ -18,6 +25,10 @@ from teacher.schemas import (
 )
 from teacher.services import get_all_conversations, get_chat_history, save_message
 
+from .broadcast import STREAM_CHANNELS, broadcaster
+from .config import settings
+from .etag import conditional_response, user_version
+from .metrics import request_metrics
 from .models import User
 from .schemas import UserPasswordUpdate
 
@@ -59,7 +70,10 @@ async def reply_to_teacher(
 
 @core_router.get("/healthcheck", name="healthcheck", operation_id="get_healthcheck")
 async def healthcheck():
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"detail": "STATUS_OK"})
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"detail": "STATUS_OK", "database_pool": get_pool_status()},
+    )
 
 
 @core_router.post(
@@ -102,13 +116,58 @@ async def reset_account(
         return None
 
 
+async def _me_version(current_user: User, db: AsyncSession, **kwargs) -> str:
+    return await user_version(db, current_user.id)
+
+
 @core_router.get("/me", operation_id="get_me")
+@conditional_response(_me_version)
 async def read_user_profile(
-    request: Request, current_user: Annotated[User, Depends(get_current_user)]
+    request: Request,
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
     return current_user
 
 
+# Server-sent events, kept out of the OpenAPI schema so the generated client
+# does not grow a blocking method for it; see libs/applibs/live_updates.py
+@core_router.get("/stream", include_in_schema=False)
+async def stream_updates(
+    request: Request,
+    principal: Annotated[Principal, Depends(get_current_principal)],
+    channels: str = Query(
+        ..., description="Comma separated channels, e.g. messages,files"
+    ),
+):
+    requested = {channel.strip() for channel in channels.split(",") if channel.strip()}
+
+    unknown = requested - STREAM_CHANNELS.keys()
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown channels: {', '.join(sorted(unknown)) or channels}",
+        )
+    forbidden = [
+        channel
+        for channel in requested
+        if STREAM_CHANNELS[channel] is not None
+        and principal.role not in STREAM_CHANNELS[channel]
+    ]
+    if forbidden:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not allowed to subscribe to: {', '.join(sorted(forbidden))}",
+        )
+
+    return StreamingResponse(
+        broadcaster.stream(request, requested, principal.id, principal.role),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # @core_router.get("/all-conversations/")
 # async def get_all_conversations_endpoint(db: AsyncSession = Depends(get_async_db)):
 #     conversations = await get_all_conversations(db)
@@ -136,3 +195,18 @@ async def read_user_profile(
 #     )
 #     await save_message(db, message_data)
 #     return {"status": "Reply sent to teacher"}
+
+
+# Prometheus scrape target, see core/metrics.py
+@core_router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        supplied = request.headers.get("authorization", "")
+        if not secrets.compare_digest(supplied.encode(), expected.encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return PlainTextResponse(
+        request_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
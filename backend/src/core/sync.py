@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+
+SINCE_QUERY = Query(
+    None,
+    description="Only rows changed at or after this time: next_since of the "
+    "previous sync, or 1970-01-01T00:00:00 for a first full sync",
+)
+
+
+def _as_naive_utc(moment: datetime) -> datetime:
+    # updated_at is stored as naive UTC (SQLite's CURRENT_TIMESTAMP)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+async def get_changes_since(
+    db: AsyncSession, query: Select, model, since: datetime
+) -> dict:
+    """Rows of ``query`` changed since ``since``, split into live and deleted.
+
+    The window opens SYNC_OVERLAP_SECONDS before ``since``: timestamps only
+    have second resolution on SQLite and a transaction may commit after a
+    newer change was already read, so a short overlap keeps changes from being
+    skipped. Clients merge by id, so seeing a row twice is harmless.
+    """
+    since = _as_naive_utc(since)
+    window_start = since - timedelta(seconds=int(settings.SYNC_OVERLAP_SECONDS))
+
+    result = await db.execute(
+        query.where(model.updated_at >= window_start).order_by(
+            model.updated_at, model.id
+        )
+    )
+    rows = result.scalars().all()
+
+    next_since: Optional[datetime] = max(
+        [since, *(_as_naive_utc(row.updated_at) for row in rows if row.updated_at)]
+    )
+    return {
+        "items": [row for row in rows if not row.is_deleted],
+        "deleted": [row.id for row in rows if row.is_deleted],
+        "next_since": next_since,
+    }
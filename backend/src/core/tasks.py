@@ -0,0 +1,245 @@
+"""In-process background tasks for work that can happen after the response.
+
+A task is an async function registered under a name. ``enqueue`` records the
+name and its JSON-serializable keyword arguments and returns at once; a fixed
+number of workers run the tasks, retrying failures with exponential backoff.
+Shutdown waits up to TASK_DRAIN_SECONDS for the queue to empty.
+
+With TASK_QUEUE_PERSIST the queue is mirrored to a small SQLite file and
+whatever was still pending when the process stopped runs after the next
+start. A task that was running during a crash runs again, so tasks have to
+be idempotent.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    kwargs: Dict[str, Any]
+    attempt: int = 0
+    # row in the persistent store, when there is one
+    row_id: Optional[int] = None
+    retry_handle: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+
+class TaskStore:
+    """SQLite mirror of the pending jobs. Blocking: call it from a thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        with self._lock:
+            self._conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "name TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "status TEXT NOT NULL DEFAULT 'pending', "
+                "error TEXT, "
+                "created_at REAL NOT NULL)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def add(self, name: str, kwargs: Dict[str, Any]) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO tasks (name, payload, created_at) VALUES (?, ?, ?)",
+                (name, json.dumps(kwargs), time.time()),
+            )
+            return cursor.lastrowid
+
+    def set_attempts(self, row_id: int, attempts: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET attempts = ? WHERE id = ?", (attempts, row_id)
+            )
+
+    def remove(self, row_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (row_id,))
+
+    def fail(self, row_id: int, error: str) -> None:
+        # failed jobs stay in the file for inspection, they are not run again
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = 'failed', error = ? WHERE id = ?",
+                (error, row_id),
+            )
+
+    def pending(self) -> List[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name, payload, attempts FROM tasks "
+                "WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        return [
+            Job(name=name, kwargs=json.loads(payload), attempt=attempts, row_id=row_id)
+            for row_id, name, payload, attempts in rows
+        ]
+
+
+class TaskQueue:
+    def __init__(self):
+        self.handlers: Dict[str, Tuple[Callable[..., Awaitable[Any]], int]] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.store: Optional[TaskStore] = None
+        self.workers: List[asyncio.Task] = []
+        self._retrying: Set[asyncio.TimerHandle] = set()
+        # jobs enqueued and not yet finished, retries included
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def task(self, name: str, retries: Optional[int] = None):
+        """Register the decorated coroutine function as task ``name``."""
+
+        def decorator(func):
+            max_retries = settings.TASK_MAX_RETRIES if retries is None else retries
+            self.handlers[name] = (func, int(max_retries))
+            return func
+
+        return decorator
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        if settings.TASK_QUEUE_PERSIST:
+            self.store = TaskStore(settings.TASK_QUEUE_DB_PATH)
+            await run_in_threadpool(self.store.open)
+            for job in await run_in_threadpool(self.store.pending):
+                if job.name not in self.handlers:
+                    logger.warning(f"Dropping stored task with unknown name {job.name}")
+                    await run_in_threadpool(self.store.fail, job.row_id, "unknown task")
+                    continue
+                self._track(job)
+            if self._outstanding:
+                logger.info(f"Resuming {self._outstanding} stored tasks")
+
+        self.workers = [
+            asyncio.create_task(self._work()) for _ in range(int(settings.TASK_WORKERS))
+        ]
+
+    async def stop(self) -> None:
+        """Drain the queue for up to TASK_DRAIN_SECONDS, then stop the workers."""
+        if self.queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), settings.TASK_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            fate = "resume on next start" if self.store else "are dropped"
+            logger.warning(f"{self._outstanding} tasks unfinished at shutdown, {fate}")
+
+        for handle in self._retrying:
+            handle.cancel()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        if self.store is not None:
+            await run_in_threadpool(self.store.close)
+
+        self.queue, self.store, self.workers = None, None, []
+        self._retrying.clear()
+        self._outstanding = 0
+        self._idle.set()
+
+    async def enqueue(self, name: str, **kwargs) -> None:
+        if name not in self.handlers:
+            raise ValueError(f"Unknown task {name!r}")
+
+        job = Job(name=name, kwargs=kwargs)
+        if self.queue is None:
+            # no running queue (scripts, the admin shell): do the work now
+            await self._run(job)
+            return
+
+        if self.store is not None:
+            job.row_id = await run_in_threadpool(self.store.add, name, kwargs)
+        self._track(job)
+
+    def _track(self, job: Job) -> None:
+        self._outstanding += 1
+        self._idle.clear()
+        self.queue.put_nowait(job)
+
+    def _finish(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._idle.set()
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                if await self._run(job):
+                    self._finish()
+            except Exception:
+                # bookkeeping failed (the store), never let that kill a worker
+                logger.exception(f"Task {job.name} could not be settled")
+                self._finish()
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job) -> bool:
+        """Run ``job`` once; False when it has been scheduled for a retry."""
+        func, max_retries = self.handlers[job.name]
+        try:
+            await func(**job.kwargs)
+        except Exception as e:
+            job.attempt += 1
+            if self.queue is None or job.attempt > max_retries:
+                logger.exception(f"Task {job.name} failed after {job.attempt} attempts")
+                if self.store is not None and job.row_id is not None:
+                    await run_in_threadpool(self.store.fail, job.row_id, repr(e))
+                return True
+
+            delay = float(settings.TASK_RETRY_BASE_SECONDS) * 2 ** (job.attempt - 1)
+            logger.warning(f"Task {job.name} failed ({e!r}), retrying in {delay}s")
+            if self.store is not None and job.row_id is not None:
+                await run_in_threadpool(
+                    self.store.set_attempts, job.row_id, job.attempt
+                )
+            job.retry_handle = asyncio.get_running_loop().call_later(
+                delay, self._retry, job
+            )
+            self._retrying.add(job.retry_handle)
+            return False
+
+        if self.store is not None and job.row_id is not None:
+            await run_in_threadpool(self.store.remove, job.row_id)
+        return True
+
+    def _retry(self, job: Job) -> None:
+        self._retrying.discard(job.retry_handle)
+        if self.queue is not None:
+            self.queue.put_nowait(job)
+
+
+task_queue = TaskQueue()
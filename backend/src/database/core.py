@@ -1,24 +1,100 @@
 import logging
+import time
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Dict
 
 from core.config import settings
-from sqlalchemy import Boolean, DateTime, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    MetaData,
+    Table,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateSchema
+from sqlalchemy.sql.functions import FunctionElement
+
+from .sqlite import WriteQueuedSession, apply_sqlite_profile
 
 logger = logging.getLogger(__name__)
 
 
+class PoolWaitStats:
+    """Running totals of how long checkouts waited for a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float):
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        average = self.total_wait / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(average * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+        }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - started)
+
+
 async_engine = create_async_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DATABASE_ENGINE_POOL_SIZE,
+    max_overflow=settings.DATABASE_ENGINE_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_ENGINE_POOL_TIMEOUT,
+    pool_pre_ping=settings.DATABASE_ENGINE_POOL_PING,
 )
-AsyncSessionLocal = async_sessionmaker(bind=async_engine)
+session_options = {}
+if async_engine.dialect.name == "sqlite":
+    apply_sqlite_profile(async_engine)
+    if settings.DATABASE_SQLITE_WRITE_QUEUE:
+        session_options["sync_session_class"] = WriteQueuedSession
+
+# one session factory for the whole process, shared by every request
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, expire_on_commit=False, **session_options
+)
+
+# Bump SCHEMA_VERSION whenever an existing table changes and register the
+# upgrade step in MIGRATIONS. Fresh databases get the full schema from
+# create_all, so every step has to be safe to run against it as well.
+SCHEMA_VERSION = 4
+MIGRATIONS: Dict[int, Callable[[Connection], None]] = {}
 
 
 class RemoveBaseFieldMixin:
@@ -27,15 +103,47 @@ class RemoveBaseFieldMixin:
     is_deleted: None
 
 
+# PostgreSQL keeps every table in DATABASE_SCHEMA; SQLite has no schemas
+DATABASE_SCHEMA = (
+    settings.DATABASE_SCHEMA if async_engine.dialect.name == "postgresql" else None
+)
+
+
+class precise_now(FunctionElement):
+    """The database's current time with sub-second precision.
+
+    now() is already precise on PostgreSQL; SQLite's CURRENT_TIMESTAMP stops
+    at whole seconds, so two edits of a row within a second would look alike
+    to the ETag and sync versions.
+    """
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _compile_precise_now(element, compiler, **kw):
+    return compiler.process(func.now(), **kw)
+
+
+@compiles(precise_now, "sqlite")
+def _compile_precise_now_sqlite(element, compiler, **kw):
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     __abstract__ = True
-    # TODO: find a way to not create a schema each time a table is created
+    metadata = MetaData(schema=DATABASE_SCHEMA)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    # indexed for the "since" sync endpoints, see core/sync.py
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=precise_now(),
+        index=True,
     )
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -43,17 +151,117 @@ class Base(AsyncAttrs, DeclarativeBase):
         return {field.name: getattr(self, field.name) for field in self.__table__.c}
 
 
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _create_missing_indexes(sync_conn: Connection) -> None:
+    # create_all skips tables that already exist, so indexes added to an
+    # existing model have to be created on their own
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {
+            column["name"]
+            for column in inspector.get_columns(table.name, schema=table.schema)
+        }
+        for index in table.indexes:
+            # columns a later step adds get their index created by that step
+            if all(column.name in existing for column in index.columns):
+                index.create(sync_conn, checkfirst=True)
+
+
+def _add_missing_columns(sync_conn: Connection) -> None:
+    # same story for columns: they are added as plain nullable columns, any
+    # constraint has to come with its own migration step
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {
+            column["name"]
+            for column in inspector.get_columns(table.name, schema=table.schema)
+        }
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(
+                text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                )
+            )
+    _create_missing_indexes(sync_conn)
+
+
+# 2: application queue index on (status, is_deleted, created_at)
+MIGRATIONS[2] = _create_missing_indexes
+# 3: updated_at index on every table
+MIGRATIONS[3] = _create_missing_indexes
+# 4: blobs table, files.blob_sha256 reference
+MIGRATIONS[4] = _add_missing_columns
+
+
+def _get_schema_version(sync_conn: Connection) -> int:
+    if not inspect(sync_conn).has_table(
+        schema_version_table.name, schema=schema_version_table.schema
+    ):
+        return 0
+    version = sync_conn.execute(select(schema_version_table.c.version)).scalar()
+    return version or 0
+
+
+def _migrate(sync_conn: Connection) -> int:
+    if DATABASE_SCHEMA is not None:
+        sync_conn.execute(CreateSchema(DATABASE_SCHEMA, if_not_exists=True))
+
+    current_version = _get_schema_version(sync_conn)
+    if current_version == SCHEMA_VERSION:
+        return current_version
+
+    Base.metadata.create_all(sync_conn)
+    for version in range(current_version + 1, SCHEMA_VERSION + 1):
+        step = MIGRATIONS.get(version)
+        if step is not None:
+            logger.info(f"Applying schema migration {version}")
+            step(sync_conn)
+
+    sync_conn.execute(delete(schema_version_table))
+    sync_conn.execute(insert(schema_version_table).values(version=SCHEMA_VERSION))
+    return current_version
+
+
 async def init_models():
+    """Create or upgrade the schema once, at application startup.
+
+    The stored schema version is compared with SCHEMA_VERSION, so a database
+    that is already current costs a single lookup and no table inspection.
+    """
     async with async_engine.begin() as async_conn:
-        await async_conn.run_sync(Base.metadata.create_all)
+        previous_version = await async_conn.run_sync(_migrate)
+
+    if previous_version == SCHEMA_VERSION:
+        logger.info(f"Database schema is current (version {SCHEMA_VERSION})")
+    else:
+        logger.info(
+            f"Database schema upgraded from version {previous_version} "
+            f"to {SCHEMA_VERSION}"
+        )
+
+
+def get_pool_status() -> dict:
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "wait": pool_wait_stats.snapshot(),
+    }
 
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-    await init_models()
-    async_session = async_sessionmaker(async_engine, expire_on_commit=False)
-
-    try:
-        async with async_session() as session:
-            yield session
-    finally:
-        await session.close()
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Optional
+
+from core.config import settings
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+from sqlalchemy.util import await_only
+
+logger = logging.getLogger(__name__)
+
+
+def apply_sqlite_profile(engine: AsyncEngine):
+    """Apply the SQLite performance pragmas to every new pooled connection."""
+
+    pragmas = {
+        "journal_mode": settings.DATABASE_SQLITE_JOURNAL_MODE,
+        "synchronous": settings.DATABASE_SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.DATABASE_SQLITE_MMAP_SIZE,
+        "cache_size": settings.DATABASE_SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.DATABASE_SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    logger.info(f"SQLite profile applied: {pragmas}")
+
+
+class SQLiteWriteQueue:
+    """Serializes write transactions inside the process.
+
+    SQLite allows one writer at a time. Instead of letting concurrent writers
+    race for the file lock (and fail with "database is locked"), each session
+    takes this asyncio lock just before its first write and releases it when
+    its transaction ends, so writers wait their turn in FIFO order. Plain
+    reads never take the lock and, with WAL, never wait on a writer.
+
+    A second session writing from the task whose session holds the lock
+    would wait on itself forever; it raises instead.
+    """
+
+    _HOLDS_LOCK = "holds_sqlite_write_lock"
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._holder: Optional[asyncio.Task] = None
+
+    def acquire(self, session: Session):
+        if session.info.get(self._HOLDS_LOCK):
+            return
+        # session events run inside SQLAlchemy's greenlet, which belongs to
+        # the task that awaited the session
+        task = asyncio.current_task()
+        if task is not None and task is self._holder:
+            raise RuntimeError(
+                "Another session of this task has uncommitted SQLite writes; "
+                "commit or roll it back before writing from a nested session"
+            )
+        # the lock can be awaited here without blocking the event loop
+        await_only(self._lock.acquire())
+        self._holder = task
+        session.info[self._HOLDS_LOCK] = True
+
+    def release(self, session: Session):
+        if session.info.pop(self._HOLDS_LOCK, False):
+            self._holder = None
+            self._lock.release()
+
+
+sqlite_write_queue = SQLiteWriteQueue()
+
+
+class WriteQueuedSession(Session):
+    pass
+
+
+@event.listens_for(WriteQueuedSession, "before_flush")
+def _queue_flush(session: Session, flush_context, instances):
+    sqlite_write_queue.acquire(session)
+
+
+@event.listens_for(WriteQueuedSession, "do_orm_execute")
+def _queue_dml(orm_execute_state: ORMExecuteState):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        sqlite_write_queue.acquire(orm_execute_state.session)
+
+
+@event.listens_for(WriteQueuedSession, "after_transaction_end")
+def _release_queue(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        sqlite_write_queue.release(session)
@@ -1,17 +1,21 @@
 import logging
-from typing import Annotated, List
+from datetime import datetime
+from typing import Annotated, List, Optional, Union
 
 from auth.services import admin_access
+from core.cache import cache_response
+from core.sync import SINCE_QUERY
 from database.core import get_async_db
 from fastapi import APIRouter, Depends, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .schemas import EventCreate, EventResponse, EventUpdate
+from .schemas import EventChanges, EventCreate, EventResponse, EventUpdate
 from .services import (
     create_new_event,
     delete_event_by_id,
     get_all_events,
     get_event_by_id,
+    get_event_changes,
     update_event,
 )
 
@@ -38,10 +42,17 @@ async def create_event(
 @events_router.get(
     "/events",
     summary="List events",
-    response_model=List[EventResponse],
+    response_model=Union[List[EventResponse], EventChanges],
     operation_id="get_events",
 )
-async def view_events(db: Annotated[AsyncSession, Depends(get_async_db)]):
+@cache_response("events")
+async def view_events(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    since: Optional[datetime] = SINCE_QUERY,
+):
+    # with a cursor only the changes are sent: {items, deleted, next_since}
+    if since is not None:
+        return await get_event_changes(db=db, since=since)
     events = await get_all_events(db=db)
     return events
 
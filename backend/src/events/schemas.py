@@ -1,5 +1,5 @@
-from datetime import date, time
-from typing import Optional
+from datetime import date, datetime, time
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,7 @@ class EventCreate(BaseModel):
 
 
 class EventResponse(BaseModel):
+    id: int
     name: str
     description: str
     start_time: time
@@ -20,6 +21,12 @@ class EventResponse(BaseModel):
     date: date
 
 
+class EventChanges(BaseModel):
+    items: List[EventResponse]
+    deleted: List[int]
+    next_since: datetime
+
+
 class EventUpdate(BaseModel):
     name: Optional[str] = Field(None, description="Name of the event")
     description: Optional[str] = Field(None, description="Description of the event")
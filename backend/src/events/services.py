@@ -1,5 +1,8 @@
+from datetime import datetime
 from typing import List, Optional
 
+from core.cache import response_cache
+from core.sync import get_changes_since
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,11 +16,16 @@ async def get_all_events(db: AsyncSession) -> List[Event]:
     return event.scalars().all()
 
 
+async def get_event_changes(db: AsyncSession, since: datetime) -> dict:
+    return await get_changes_since(db, select(Event), Event, since)
+
+
 async def create_new_event(event: EventCreate, db: AsyncSession):
     new_event = Event(**event.model_dump())
 
     db.add(new_event)
     await db.commit()
+    await response_cache.invalidate("events")
     await db.refresh(new_event)
 
     return new_event
@@ -45,6 +53,7 @@ async def update_event(
 
     db.add(event)
     await db.commit()
+    await response_cache.invalidate("events")
     await db.refresh(event)
 
     return event
@@ -57,6 +66,7 @@ async def delete_event_by_id(event_id: int, db: AsyncSession) -> Optional[Event]
 
     event.is_deleted = True
     await db.commit()
+    await response_cache.invalidate("events")
     await db.refresh(event)
 
     return event
@@ -1,4 +1,8 @@
 # from auth.utils import JWTAuth
+import asyncio
+import logging.config
+from contextlib import asynccontextmanager
+
 from admin.admin import (
     ApplicationAdmin,
     # CallAdmin,
@@ -13,20 +17,50 @@ from admin.admin import (
 from application.routers import application_router  # noqa: F401
 from auth.routers import auth_router  # noqa: F401
 from calls.routers import call_router  # noqa: F401
+from core.config import LOGGING_CONFIG, settings
+from core.metrics import MetricsMiddleware
 from core.routers import core_router  # noqa: F401
-from database.core import async_engine  # noqa: F401
+from core.tasks import task_queue
+from database.core import async_engine, init_models  # noqa: F401
 from events.routers import events_router  # noqa: F401
 from fastapi_offline import FastAPIOffline
 from messages.routers import message_router  # noqa: F401
 from sqladmin import Admin
 from student.routers import student_router, student_subject_router  # noqa: F401
+from subject.registry import subject_registry
 from subject.routers import subject_router  # noqa: F401
 from teacher.routers import teacher_router  # noqa: F401
 
-app = FastAPIOffline()
+logging.config.dictConfig(LOGGING_CONFIG)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # All routers (and with them every model) are imported above, so the
+    # metadata is complete by the time the schema is created or verified.
+    await init_models()
+    await task_queue.start()
+
+    await subject_registry.reload()
+    refresh_task = None
+    if int(settings.SUBJECT_REGISTRY_REFRESH_SECONDS) > 0:
+        refresh_task = asyncio.create_task(subject_registry.refresh_periodically())
+
+    yield
+
+    if refresh_task is not None:
+        refresh_task.cancel()
+    # queued work may still need the database
+    await task_queue.stop()
+    await async_engine.dispose()
+
+
+app = FastAPIOffline(lifespan=lifespan)
 admin = Admin(app=app, engine=async_engine)
 # Add the Authentication middleware
 # app.add_middleware(JWTAuth)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(auth_router)
@@ -1,9 +1,13 @@
 import logging
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
 from auth.services import admin_access
+from core.etag import conditional_response, table_version
+from core.pagination import PageParams, paginate
+from core.sync import SINCE_QUERY, get_changes_since
 from database.core import get_async_db
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -34,11 +38,23 @@ async def post_send_message(
     return mssg
 
 
+async def _messages_version(db: AsyncSession, **kwargs) -> str:
+    return await table_version(db, Message)
+
+
 @message_router.get("/", summary="List messages", operation_id="get_messages")
-async def get_messages(db: Annotated[AsyncSession, Depends(get_async_db)]):
-    messages = await db.execute(select(Message))
-    messages = messages.scalars().all()
-    return messages
+@conditional_response(_messages_version)
+async def get_messages(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    since: Optional[datetime] = SINCE_QUERY,
+):
+    # with a cursor only the changes are sent: {items, deleted, next_since}
+    if since is not None:
+        return await get_changes_since(db, select(Message), Message, since)
+    return await paginate(db, select(Message), Message.id, page)
 
 
 @message_router.get(
@@ -1,6 +1,6 @@
-from datetime import datetime
 from typing import List, Optional
 
+from core.broadcast import broadcaster
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -25,6 +25,7 @@ async def send_message(message: str, db: AsyncSession):
     db.add(new_message)
     await db.commit()
     await db.refresh(new_message)
+    broadcaster.publish("messages", new_message.to_dict())
 
     return new_message
 
@@ -51,6 +52,7 @@ async def update_messages(
     db.add(message)
     await db.commit()
     await db.refresh(message)
+    broadcaster.publish("messages", message.to_dict())
 
     return message
 
@@ -61,8 +63,9 @@ async def remove_message_by_id(message_id: int, db: AsyncSession) -> Optional[Me
     message = res.scalar_one_or_none()
     if not message:
         return None
+    # updated_at is bumped by the column's onupdate, in the database's clock
     message.is_deleted = True
-    message.updated_at = datetime.now()
     await db.commit()
     await db.refresh(message)
+    broadcaster.publish("messages", message.to_dict())
     return message
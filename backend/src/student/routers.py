@@ -1,22 +1,29 @@
 import logging
 from typing import Annotated, List
 
-from auth.services import admin_access, get_current_user
+from auth.schemas import Principal
+from auth.services import admin_access
+from auth.utils import get_current_principal, invalidate_cached_user
 from core.associations import UserSubjectAssociation
 from core.enums import Role
-from core.models import User
+from core.pagination import PageParams
+from core.projections import get_user_list_columns
 from database.core import get_async_db
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from subject.models import Subject
+from subject.registry import subject_registry
 from subject.schemas import SubjectCreate
-from subject.services import get_subject_by_name
 
-from .schemas import StudentUpdate
+from .schemas import StudentBatchUpdate, StudentUpdate
 from .services import (
+    add_student_subjects,
+    get_all_students,
     get_student_account_by_id,
     remove_student_by_id,
     update_student_account,
+    update_students_batch,
 )
 
 student_router = APIRouter(prefix="/student", tags=["Students"])
@@ -31,11 +38,12 @@ ogger = logging.getLogger(__name__)
     dependencies=[Depends(admin_access)],
     operation_id="get_students",
 )
-async def get_useraccounts(db: Annotated[AsyncSession, Depends(get_async_db)]):
-    query = select(User).where(User.role == Role.STUDENT)
-    users = await db.execute(query)
-    users = users.scalars().all()
-    return users
+async def get_useraccounts(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    columns: Annotated[List, Depends(get_user_list_columns)],
+):
+    return await get_all_students(db=db, page=page, columns=columns)
 
 
 @student_router.get(
@@ -58,7 +66,7 @@ async def get_student_by_id(
     operation_id="patch_update_student",
 )
 async def update_useraccount(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     updated_student: StudentUpdate,
     db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
@@ -74,6 +82,20 @@ async def update_useraccount(
     return new_updated_student
 
 
+@student_router.patch(
+    "/batch-update",
+    summary="Update many students in one call",
+    dependencies=[Depends(admin_access)],
+    operation_id="patch_batch_update_students",
+)
+async def batch_update_useraccounts(
+    updates: List[StudentBatchUpdate],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    results = await update_students_batch(student_updates=updates, db=db)
+    return {"results": results}
+
+
 @student_router.delete(
     "/delete/{student_id}",
     summary="delete a user account using its ID",
@@ -98,7 +120,7 @@ async def delete_useraccount(
 async def get_subjects_for_student(
     db: Annotated[AsyncSession, Depends(get_async_db)],
     current_user: Annotated[
-        User, Depends(get_current_user)
+        Principal, Depends(get_current_principal)
     ],  # Ensure this checks the user, not admin
 ):
     if not current_user:
@@ -113,23 +135,22 @@ async def get_subjects_for_student(
             detail="Only students can access this information",
         )
 
-    # Fetch all subjects associated with this user
-    query = select(UserSubjectAssociation).where(
-        UserSubjectAssociation.user_id == current_user.id,
-        UserSubjectAssociation.is_deleted.is_(
-            False
-        ),  # Assuming this is for soft-deleted associations
+    # Fetch the subject name and grade in one query; the principal carries no
+    # loaded relationships and lazy loading is not available under asyncio
+    query = (
+        select(Subject.name, UserSubjectAssociation.grade)
+        .join(UserSubjectAssociation.subject)
+        .where(
+            UserSubjectAssociation.user_id == current_user.id,
+            UserSubjectAssociation.is_deleted.is_(
+                False
+            ),  # Assuming this is for soft-deleted associations
+        )
     )
     result = await db.execute(query)
-    associations = result.scalars().all()
 
-    # You may want to return detailed info, including the subject name and grade
     subjects_with_grades = [
-        {
-            "name": association.subject.name,
-            "grade": association.grade,  # Assuming grade is stored in 'grade'
-        }
-        for association in associations
+        {"name": name, "grade": grade} for name, grade in result.all()
     ]
 
     return subjects_with_grades
@@ -142,7 +163,7 @@ async def get_subjects_for_student(
 )
 async def add_subject_to_student(
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     subject_in: SubjectCreate,  # Assuming this schema contains name and grade/grade
 ):
     if not current_user:
@@ -151,7 +172,7 @@ async def add_subject_to_student(
         )
 
     # Fetch the subject by name
-    subject = await get_subject_by_name(db=db, subject_name=subject_in.name)
+    subject = await subject_registry.resolve_by_name(db, subject_in.name)
     if not subject:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Subject not found"
@@ -182,6 +203,7 @@ async def add_subject_to_student(
     # Add the association to the database
     db.add(association)
     await db.commit()
+    invalidate_cached_user(current_user.id)
     await db.refresh(association)
 
     return {"message": "Subject added successfully", "association": association}
@@ -194,7 +216,7 @@ async def add_subject_to_student(
 )
 async def add_bulk_subjects_to_student(
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     subjects: List[SubjectCreate],  # Expecting a list of subjects with grades
 ):
     if not current_user:
@@ -202,51 +224,18 @@ async def add_bulk_subjects_to_student(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    # List to hold successful associations
-    successful_associations = []
-
-    for subject_in in subjects:
-        # Fetch the subject by name
-        subject = await get_subject_by_name(db=db, subject_name=subject_in.name)
-        if not subject:
-            # If the subject doesn't exist, skip it and continue to the next
-            continue
-
-        # Check if the user already has this subject
-        existing_association_query = select(UserSubjectAssociation).where(
-            UserSubjectAssociation.user_id == current_user.id,
-            UserSubjectAssociation.subject_id == subject.id,
-            UserSubjectAssociation.is_deleted.is_(
-                False
-            ),  # Exclude deleted associations
-        )
-        result = await db.execute(existing_association_query)
-        existing_association = result.scalar_one_or_none()
-
-        if existing_association:
-            # If the association already exists, you might want to skip it or raise an error
-            continue
-
-        # Create a new subject association
-        association = UserSubjectAssociation(
-            user_id=current_user.id,
-            subject_id=subject.id,
-            grade=subject_in.grade,  # Assuming 'grade' represents the grade
-        )
-
-        # Add the association to the database
-        db.add(association)
-        successful_associations.append(association)
-
-    # Commit all associations
-    await db.commit()
+    outcomes = await add_student_subjects(
+        db=db, user_id=current_user.id, subjects=subjects
+    )
 
     return {
         "message": "Subjects added successfully",
         "associations": [
-            {"subject_name": assoc.subject.name, "grade": assoc.grade}
-            for assoc in successful_associations
+            {"subject_name": item["subject_name"], "grade": item["grade"]}
+            for item in outcomes
+            if item["status"] == "added"
         ],
+        "results": outcomes,
     }
 
 
@@ -257,7 +246,7 @@ async def add_bulk_subjects_to_student(
 )
 async def remove_subject_from_student(
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     subject_name: str,
 ):
     if not current_user:
@@ -266,7 +255,7 @@ async def remove_subject_from_student(
         )
 
     # Fetch the subject by name
-    subject = await get_subject_by_name(db=db, subject_name=subject_name)
+    subject = await subject_registry.resolve_by_name(db, subject_name)
     if not subject:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Subject not found"
@@ -292,6 +281,7 @@ async def remove_subject_from_student(
     # Hard delete the association
     await db.delete(association)
     await db.commit()
+    invalidate_cached_user(current_user.id)
 
     return {"message": f"Subject {subject_name} successfully removed from student."}
 
@@ -1,4 +1,5 @@
 from datetime import date
+from typing import Optional
 
 from core.enums import EducationLevel, Gender
 from pydantic import BaseModel
@@ -14,6 +15,19 @@ class StudentUpdate(BaseModel):
     current_academic_level: EducationLevel
 
 
+class StudentBatchUpdate(BaseModel):
+    """One row of a batch update: the student id and only the fields to change."""
+
+    id: int
+    date_of_birth: Optional[date] = None
+    id_number: Optional[str] = None
+    number_of_passed_subjects: Optional[int] = None
+    gender: Optional[Gender] = None
+    previous_school: Optional[str] = None
+    next_of_kin: Optional[str] = None
+    current_academic_level: Optional[EducationLevel] = None
+
+
 class StudentReactivateDeactivateSchema(BaseModel):
     # id: int
     is_active: bool
@@ -1,20 +1,24 @@
 from typing import List, Optional
 
+from auth.utils import invalidate_cached_user
+from core.associations import UserSubjectAssociation
+from core.batch import update_users_batch
 from core.models import Role, User
+from core.pagination import PageParams, paginate
 from fastapi import HTTPException
-from sqlalchemy import and_, select
+from sqlalchemy import and_, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from subject.registry import subject_registry
+from subject.schemas import SubjectCreate
 
-from .schemas import StudentUpdate
+from .schemas import StudentBatchUpdate, StudentUpdate
 
 
-async def get_all_students(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> List[User]:
-    query = select(User).where(User.role == Role.STUDENT).offset(skip).limit(limit)
-    users = await db.execute(query)
-    return users.scalars().all()
+async def get_all_students(db: AsyncSession, page: PageParams, columns: List) -> dict:
+    # project only the requested columns: no password hash, no relationship loads
+    query = select(*columns).where(User.role == Role.STUDENT)
+    return await paginate(db, query, User.id, page, as_mappings=True)
 
 
 async def get_student_account_by_id(
@@ -48,34 +52,15 @@ async def update_student_account(
 
     db.add(student)
     await db.commit()
+    invalidate_cached_user(student.id)
     await db.refresh(student)
     return student
 
 
 async def update_students_batch(
-    student_updates: List[StudentUpdate], db: AsyncSession
-) -> List[User]:
-    updated_students = []
-    for update_data in student_updates:
-        student = await get_student_account_by_id(student_id=update_data.id, db=db)
-        if not student:
-            continue  # Optionally raise an exception or log missing students
-
-        for field, value in update_data.model_dump(exclude_unset=True).items():
-            setattr(student, field, value)
-
-        db.add(student)
-        updated_students.append(student)
-
-    await (
-        db.commit()
-    )  # Commit all at once, reducing the number of database transactions
-    for student in updated_students:
-        await db.refresh(
-            student
-        )  # Optionally refresh each one if you need updated data
-
-    return updated_students
+    student_updates: List[StudentBatchUpdate], db: AsyncSession
+) -> List[dict]:
+    return await update_users_batch(db=db, role=Role.STUDENT, updates=student_updates)
 
 
 async def reset(student_id: int, student_in: StudentUpdate, db: AsyncSession) -> User:
@@ -89,6 +74,7 @@ async def reset(student_id: int, student_in: StudentUpdate, db: AsyncSession) ->
 
     db.add(student)
     await db.commit()
+    invalidate_cached_user(student.id)
     await db.refresh(student)
     return student
 
@@ -101,6 +87,7 @@ async def remove_student_by_id(id: int, db: AsyncSession) -> User:
 
     student.is_deleted = True
     await db.commit()
+    invalidate_cached_user(student.id)
     await db.refresh(student)
     return student
 
@@ -113,5 +100,73 @@ async def set_student_account_status(db: AsyncSession, id: int) -> User:
 
     student.is_active = not student.is_active
     await db.commit()
+    invalidate_cached_user(student.id)
     await db.refresh(student)
     return student
+
+
+async def add_student_subjects(
+    db: AsyncSession, user_id: int, subjects: List[SubjectCreate]
+) -> List[dict]:
+    """Enroll a student in many subjects with a fixed number of queries.
+
+    Returns one outcome per payload item: added, not_found, already_enrolled
+    or duplicate (the same subject appears earlier in the payload).
+    """
+    # subject names resolve against the in-process registry; the names it
+    # does not know yet cost one query between them
+    records = await subject_registry.resolve_many_by_name(
+        db, [subject_in.name for subject_in in subjects]
+    )
+    subject_ids = {name: record.id for name, record in records.items()}
+
+    # every association the student already has for them in one query
+    result = await db.execute(
+        select(
+            UserSubjectAssociation.subject_id, UserSubjectAssociation.is_deleted
+        ).where(
+            UserSubjectAssociation.user_id == user_id,
+            UserSubjectAssociation.subject_id.in_(subject_ids.values()),
+        )
+    )
+    existing = dict(result.all())
+
+    outcomes, new_rows, revived_rows, seen = [], [], [], set()
+    for subject_in in subjects:
+        subject_id = subject_ids.get(subject_in.name)
+        if subject_id is None:
+            outcome = "not_found"
+        elif subject_id in seen:
+            outcome = "duplicate"
+        elif existing.get(subject_id) is False:
+            outcome = "already_enrolled"
+        else:
+            outcome = "added"
+            row = {"user_id": user_id, "subject_id": subject_id}
+            # soft-deleted rows still hold the primary key, so bring them back
+            if subject_id in existing:
+                revived_rows.append(
+                    {**row, "grade": subject_in.grade, "is_deleted": False}
+                )
+            else:
+                new_rows.append({**row, "grade": subject_in.grade})
+
+        if subject_id is not None:
+            seen.add(subject_id)
+        outcomes.append(
+            {
+                "subject_name": subject_in.name,
+                "grade": subject_in.grade,
+                "status": outcome,
+            }
+        )
+
+    if new_rows:
+        await db.execute(insert(UserSubjectAssociation), new_rows)
+    if revived_rows:
+        await db.execute(update(UserSubjectAssociation), revived_rows)
+    if new_rows or revived_rows:
+        await db.commit()
+        invalidate_cached_user(user_id)
+
+    return outcomes
@@ -41,3 +41,9 @@ class SubjectNames(Enum):
     CHEMISTRY = "CHEMISTRY"
     HERITAGE = "HERITAGE"
     PE = "PE"
+
+
+class ConflictPolicy(Enum):
+    SKIP = "skip"
+    UPDATE = "update"
+    FAIL = "fail"
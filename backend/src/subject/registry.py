@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Union
+
+from core.config import settings
+from database.core import AsyncSessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .enums import Grades, SubjectNames
+from .models import Subject
+
+logger = logging.getLogger(__name__)
+
+
+class SubjectRecord:
+    """A subject as enrollment needs it, detached from any session."""
+
+    __slots__ = ("id", "name", "grade")
+
+    def __init__(self, id: int, name: SubjectNames, grade: Grades):
+        self.id = id
+        self.name = name
+        self.grade = grade
+
+    def __repr__(self):
+        return f"SubjectRecord(id={self.id!r}, name={self.name!r})"
+
+
+class SubjectRegistry:
+    """Process-local catalogue of the live subjects, indexed by id and name.
+
+    The subject table is bounded by the SubjectNames enum, so the whole of it
+    is kept in memory. It is loaded at startup, patched by the subject
+    services after every commit and fully reloaded every
+    SUBJECT_REGISTRY_REFRESH_SECONDS to pick up other workers' changes; until
+    then resolve_by_name and resolve_many_by_name look up names it does not
+    know yet.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, SubjectRecord] = {}
+        self._by_name: Dict[SubjectNames, SubjectRecord] = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    async def load(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(Subject.id, Subject.name, Subject.grade).where(
+                Subject.is_deleted.is_(False)
+            )
+        )
+        records = [SubjectRecord(*row) for row in result.all()]
+        # swap both indexes at once so readers never see a half-built catalogue
+        self._by_id = {record.id: record for record in records}
+        self._by_name = {record.name: record for record in records}
+
+    async def reload(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await self.load(db)
+        logger.debug(f"Subject registry loaded {len(self)} subjects")
+
+    async def refresh_periodically(self) -> None:
+        interval = int(settings.SUBJECT_REGISTRY_REFRESH_SECONDS)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.warning(f"Subject registry reload failed: {e}")
+
+    def get_by_id(self, subject_id: int) -> Optional[SubjectRecord]:
+        return self._by_id.get(subject_id)
+
+    def get_by_name(self, name: Union[SubjectNames, str]) -> Optional[SubjectRecord]:
+        # routes taking the name as a plain query string pass str values
+        try:
+            return self._by_name.get(SubjectNames(name))
+        except ValueError:
+            return None
+
+    async def resolve_by_name(
+        self, db: AsyncSession, name: Union[SubjectNames, str]
+    ) -> Optional[SubjectRecord]:
+        """Like get_by_name, but a miss is checked against the database.
+
+        Another worker may have created the subject since the last reload, so
+        a subject is only reported missing once the table agrees.
+        """
+        records = await self.resolve_many_by_name(db, [name])
+        return next(iter(records.values()), None)
+
+    async def resolve_many_by_name(
+        self, db: AsyncSession, names: Iterable[Union[SubjectNames, str]]
+    ) -> Dict[SubjectNames, SubjectRecord]:
+        """resolve_by_name for many names, with at most one query for all the
+        misses. Names that are not subjects are left out of the result.
+        """
+        records, misses = {}, set()
+        for name in names:
+            try:
+                name = SubjectNames(name)
+            except ValueError:
+                continue
+            record = self._by_name.get(name)
+            if record is not None:
+                records[name] = record
+            else:
+                misses.add(name)
+        if not misses:
+            return records
+
+        result = await db.execute(
+            select(Subject.id, Subject.name, Subject.grade).where(
+                Subject.name.in_(misses), Subject.is_deleted.is_(False)
+            )
+            # the newest row of a name is put last and wins, as in load()
+            .order_by(Subject.id)
+        )
+        for row in result.all():
+            self.put(*row)
+            records[row.name] = self.get_by_id(row.id)
+        return records
+
+    def put(self, subject_id: int, name: SubjectNames, grade: Grades) -> None:
+        self.discard(subject_id)
+        record = SubjectRecord(subject_id, name, grade)
+        self._by_id[subject_id] = record
+        self._by_name[name] = record
+
+    def put_many(self, subjects: Iterable) -> None:
+        for subject in subjects:
+            if isinstance(subject, dict):
+                self.put(subject["id"], subject["name"], subject["grade"])
+            else:
+                self.put(subject.id, subject.name, subject.grade)
+
+    def discard(self, subject_id: int) -> None:
+        record = self._by_id.pop(subject_id, None)
+        if record is not None and self._by_name.get(record.name) is record:
+            del self._by_name[record.name]
+
+
+subject_registry = SubjectRegistry()
@@ -1,17 +1,24 @@
 import logging
 from typing import Annotated, List
 
+from auth.schemas import Principal
 from auth.services import admin_access
-from auth.utils import get_current_user
-from core.models import User
+from auth.utils import get_current_principal
+from core.cache import cache_response, response_cache
 from database.core import get_async_db
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from .models import Subject
+from .registry import subject_registry
 from .schemas import SubjectCreate, SubjectResponse, SubjectsCreate, SubjectUpdate
-from .services import create_subject, get_all_subjects, update_subject
+from .services import (
+    create_subject,
+    create_subjects,
+    get_all_subjects,
+    update_subject,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +29,13 @@ subject_router = APIRouter(prefix="/subjects", tags=["Subjects"])
     "/list",
     summary="List all subjects",
     response_model=List[SubjectResponse],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     operation_id="get_subjects",
 )
+@cache_response("subjects")
 async def list_subjects(
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
 ) -> List[Subject]:
     """A student is only able to list their own subjects"""
     subjects = await get_all_subjects(db=db)
@@ -43,7 +51,7 @@ async def list_subjects(
     operation_id="post_add_subject",
 )
 async def add_subject(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     subject: SubjectCreate,
     db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> Subject:
@@ -59,15 +67,17 @@ async def add_subject(
     operation_id="post_bulk_add_subject",
 )
 async def add_subjects(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     subjects: SubjectsCreate,  # Expecting SubjectsCreate model with list of subjects
     db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> List[SubjectResponse]:
-    results = []
-    for subject in subjects.subjects:
-        _result = await create_subject(subject_in=subject, db=db)
-        results.append(_result)
-        logger.info(f"User {current_user.id} added subject {_result.name}.")
+    results = await create_subjects(
+        db=db, subjects_in=subjects.subjects, on_conflict=subjects.on_conflict
+    )
+    logger.info(
+        f"User {current_user.id} added or updated {len(results)} subjects "
+        f"({subjects.on_conflict.value} on conflict)."
+    )
     return results
 
 
@@ -108,4 +118,6 @@ async def delete_subject(
 
     deleted_subject.is_deleted = True
     await db.commit()
+    await response_cache.invalidate("subjects")
+    subject_registry.discard(deleted_subject.id)
     return deleted_subject
@@ -2,7 +2,7 @@ from typing import List
 
 from pydantic import BaseModel, ConfigDict
 
-from .enums import Grades, SubjectNames
+from .enums import ConflictPolicy, Grades, SubjectNames
 
 
 class SubjectCreate(BaseModel):
@@ -17,6 +17,8 @@ class CallRequest(BaseModel):
 
 class SubjectsCreate(BaseModel):
     subjects: List[SubjectCreate]  # Wrap the list in 'subjects' attribute
+    # what to do with subjects that already exist: skip, update or fail
+    on_conflict: ConflictPolicy = ConflictPolicy.FAIL
 
 
 class SubjectUpdate(BaseModel):
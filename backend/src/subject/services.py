@@ -1,8 +1,13 @@
-from fastapi import HTTPException
-from sqlalchemy import and_, select
+from typing import List
+
+from core.cache import response_cache
+from fastapi import HTTPException, status
+from sqlalchemy import and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .enums import ConflictPolicy
 from .models import Subject
+from .registry import subject_registry
 from .schemas import SubjectCreate, SubjectUpdate
 
 
@@ -15,11 +20,72 @@ async def create_subject(subject_in: SubjectCreate, db: AsyncSession):
     new_subject = Subject(**subject_in.model_dump())
     db.add(new_subject)
     await db.commit()
+    await response_cache.invalidate("subjects")
     await db.refresh(new_subject)
+    subject_registry.put(new_subject.id, new_subject.name, new_subject.grade)
 
     return new_subject
 
 
+async def create_subjects(
+    db: AsyncSession, subjects_in: List[SubjectCreate], on_conflict: ConflictPolicy
+) -> List:
+    """Create a batch of subjects in a single transaction.
+
+    Existing subjects are skipped, have their grade updated or fail the whole
+    batch depending on ``on_conflict``. Returns the created and updated rows.
+    """
+    names = [subject_in.name for subject_in in subjects_in]
+    duplicates = {name.value for name in names if names.count(name) > 1}
+    if duplicates:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Duplicate subjects in payload: {', '.join(sorted(duplicates))}",
+        )
+
+    # one query for every existing subject in the batch; only the columns
+    # needed, so the selectin relationships are not loaded
+    result = await db.execute(
+        select(Subject.name, Subject.id).where(
+            Subject.name.in_(names), Subject.is_deleted.is_(False)
+        )
+    )
+    existing = dict(result.all())
+
+    if existing and on_conflict == ConflictPolicy.FAIL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subjects already exist: "
+            f"{', '.join(sorted(name.value for name in existing))}",
+        )
+
+    new_subjects = [
+        Subject(**subject_in.model_dump())
+        for subject_in in subjects_in
+        if subject_in.name not in existing
+    ]
+    updated_subjects = []
+    if on_conflict == ConflictPolicy.UPDATE:
+        updated_subjects = [
+            {"id": existing[subject_in.name], **subject_in.model_dump()}
+            for subject_in in subjects_in
+            if subject_in.name in existing
+        ]
+
+    if not new_subjects and not updated_subjects:
+        return []
+
+    # the inserts go out as one batched statement on flush
+    db.add_all(new_subjects)
+    if updated_subjects:
+        await db.execute(update(Subject), updated_subjects)
+    await db.commit()
+    await response_cache.invalidate("subjects")
+    subject_registry.put_many([*new_subjects, *updated_subjects])
+
+    return [*new_subjects, *updated_subjects]
+
+
 async def get_all_subjects(db: AsyncSession):
     query = select(Subject).where(Subject.is_deleted.is_(False))
     result = await db.execute(query)
@@ -39,7 +105,11 @@ async def update_subject(db: AsyncSession, subject_id: int, subject: SubjectUpda
 
     db.add(existing_subject)
     await db.commit()
+    await response_cache.invalidate("subjects")
     await db.refresh(existing_subject)
+    subject_registry.put(
+        existing_subject.id, existing_subject.name, existing_subject.grade
+    )
 
     return existing_subject
 
@@ -0,0 +1,124 @@
+"""Content-addressed storage for uploaded files.
+
+Every distinct content is stored once, under its SHA-256 in a sharded
+directory (UPLOAD_DIR/blobs/ab/cd/abcd...). A File row is one send of that
+content and Blob.ref_count counts the live File rows, so sending the same
+worksheet to ten classes costs ten rows and one file on disk. The content is
+removed when the last File pointing at it is deleted.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from core.config import settings
+from core.tasks import task_queue
+from database.core import AsyncSessionLocal
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from .models import Blob, File
+
+BLOB_DIR = "blobs"
+
+# serializes this process's blob placement, ref count changes and unlinking, so
+# content being released is never removed under an upload that reuses it
+_store_lock = asyncio.Lock()
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def _place(source: str, destination: str) -> None:
+    # identical content is already stored: the received copy is redundant
+    if os.path.exists(destination):
+        os.remove(source)
+        return
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    os.replace(source, destination)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def find_blob(db: AsyncSession, sha256: str, size: int) -> Optional[Blob]:
+    """A stored blob with this content, if there is one to reuse."""
+    blob = await db.scalar(select(Blob).where(Blob.sha256 == sha256, Blob.size == size))
+    if blob is None or not await run_in_threadpool(os.path.exists, blob_path(sha256)):
+        return None
+    return blob
+
+
+async def add_file(
+    db: AsyncSession,
+    filename: str,
+    sha256: str,
+    size: int,
+    source: Optional[str] = None,
+) -> File:
+    """Record one send of ``filename`` with the given content.
+
+    ``source`` is the freshly received copy, moved into the store or dropped
+    if the content is already there. Leave it out when the content is known
+    to be stored (see ``find_blob``).
+    """
+    path = blob_path(sha256)
+    async with _store_lock:
+        if source is not None:
+            await run_in_threadpool(_place, source, path)
+
+        result = await db.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256)
+            .values(ref_count=Blob.ref_count + 1)
+        )
+        if result.rowcount == 0:
+            db.add(Blob(sha256=sha256, size=size, ref_count=1))
+
+        new_file = File(filename=filename, filepath=path, blob_sha256=sha256)
+        db.add(new_file)
+        await db.commit()
+    await db.refresh(new_file)
+    return new_file
+
+
+async def remove_file(db: AsyncSession, file: File) -> bool:
+    """Soft-delete ``file`` and release its content.
+
+    Returns True when that was the last reference; the content is then
+    unlinked by a background task.
+    """
+    async with _store_lock:
+        file.is_deleted = True
+        released = False
+        if file.blob_sha256 is not None:
+            await db.execute(
+                update(Blob)
+                .where(Blob.sha256 == file.blob_sha256)
+                .values(ref_count=Blob.ref_count - 1)
+            )
+            result = await db.execute(
+                delete(Blob).where(Blob.sha256 == file.blob_sha256, Blob.ref_count <= 0)
+            )
+            released = result.rowcount > 0
+        await db.commit()
+
+    if released:
+        await task_queue.enqueue("teacher.release_content", sha256=file.blob_sha256)
+    return released
+
+
+@task_queue.task("teacher.release_content")
+async def release_content(sha256: str) -> None:
+    """Unlink content nothing references, unless it was uploaded again since."""
+    async with _store_lock:
+        async with AsyncSessionLocal() as db:
+            blob = await db.scalar(select(Blob.sha256).where(Blob.sha256 == sha256))
+        if blob is None:
+            await run_in_threadpool(_unlink, blob_path(sha256))
@@ -46,6 +46,17 @@ class Conversation(Base):
     teacher = relationship("Teacher", back_populates="conversation")
 
 
+class Blob(Base):
+    """One stored file content, shared by every File row with the same bytes."""
+
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    # live File rows pointing here; the content is deleted when it reaches 0
+    ref_count = Column(Integer, nullable=False, default=0)
+
+
 class File(Base):
     __tablename__ = "files"
 
@@ -53,3 +64,5 @@ class File(Base):
     filename = Column(String, nullable=False)
     filepath = Column(String, nullable=False)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # content in the blob store; NULL for files uploaded before it existed
+    blob_sha256 = Column(String(64), index=True)
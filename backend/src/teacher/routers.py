@@ -1,16 +1,40 @@
 import logging
 import os
-from typing import Annotated
-
-from auth.services import admin_access, get_current_user
+from datetime import datetime
+from typing import Annotated, List, Optional
+
+from auth.schemas import Principal
+from auth.services import admin_access
+from auth.utils import get_current_principal
+from core.cache import cache_response
+from core.config import settings
 from core.enums import Role
-from core.models import User
+from core.etag import (
+    conditional_response,
+    is_not_modified,
+    table_version,
+    user_version,
+)
+from core.pagination import PageParams
+from core.projections import get_user_list_columns
+from core.sync import SINCE_QUERY
 from database.core import get_async_db
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 
 from teacher.schemas import (
     ChatHistoryResponse,
@@ -18,23 +42,54 @@ from teacher.schemas import (
     MessageSchema,
     ReplyResponse,
 )
-from teacher.services import get_chat_history, get_replies, save_message
+from teacher.services import (
+    get_chat_history,
+    get_chat_history_changes,
+    get_replies,
+    save_message,
+)
 
+from .blobs import find_blob
 from .models import File as FileModel
-from .schemas import TeacherUpdate
+from .schemas import TeacherBatchUpdate, TeacherUpdate, UploadSessionCreate
 from .services import (
     check_in_teacher,
     check_out_teacher,
+    delete_uploaded_file,
+    get_all_teachers,
+    get_file_changes,
     get_teacher_account_by_id,
+    get_uploaded_file,
     list_uploaded_files,
+    record_uploaded_file,
     remove_teacher_by_id,
     update_teacher_account,
+    update_teacher_batch,
 )
+from .thumbnails import request_thumbnail, thumbnail_path
+from .uploads import safe_filename, save_upload_file, upload_sessions
 
 logger = logging.getLogger(__name__)
 teacher_router = APIRouter(prefix="/teacher", tags=["Teachers"])
 
 
+async def _teacher_version(teacher_id: int, db: AsyncSession, **kwargs) -> str:
+    return await user_version(db, teacher_id)
+
+
+async def _files_version(db: AsyncSession, **kwargs) -> str:
+    return await table_version(db, FileModel)
+
+
+def _uploaded(new_file: FileModel, size: int) -> dict:
+    return {
+        "filename": new_file.filename,
+        "file_id": new_file.id,
+        "size": size,
+        "sha256": new_file.blob_sha256,
+    }
+
+
 @teacher_router.post("/send-message/")
 async def send_message(
     teacher_id, message: MessageSchema, db: AsyncSession = Depends(get_async_db)
@@ -47,7 +102,21 @@ async def send_message(
 
 
 @teacher_router.get("/chat-history/", response_model=ChatHistoryResponse)
-async def chat_history(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+async def chat_history(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    since: Optional[datetime] = SINCE_QUERY,
+):
+    # an empty delta is a normal answer, not a missing history
+    if since is not None:
+        changes = await get_chat_history_changes(db, teacher_id, since)
+        return {
+            "teacher_id": teacher_id,
+            "messages": changes["items"],
+            "deleted": changes["deleted"],
+            "next_since": changes["next_since"],
+        }
+
     messages = await get_chat_history(db, teacher_id)
     if not messages:
         raise HTTPException(status_code=404, detail="No chat history found")
@@ -75,11 +144,12 @@ class Document(BaseModel):
     dependencies=[Depends(admin_access)],
     operation_id="get_teachers",
 )
-async def get_useraccounts(db: Annotated[AsyncSession, Depends(get_async_db)]):
-    query = select(User).where(User.role == Role.TEACHER)
-    users = await db.execute(query)
-    users = users.scalars().all()
-    return users
+async def get_useraccounts(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page: Annotated[PageParams, Depends()],
+    columns: Annotated[List, Depends(get_user_list_columns)],
+):
+    return await get_all_teachers(db=db, page=page, columns=columns)
 
 
 @teacher_router.get(
@@ -88,8 +158,12 @@ async def get_useraccounts(db: Annotated[AsyncSession, Depends(get_async_db)]):
     dependencies=[Depends(admin_access)],
     operation_id="get_teacher_by_id",
 )
+@conditional_response(_teacher_version)
 async def get_teacher_by_id(
-    teacher_id: int, db: Annotated[AsyncSession, Depends(get_async_db)]
+    request: Request,
+    response: Response,
+    teacher_id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
     teacher = await get_teacher_account_by_id(teacher_id, db)
     return teacher
@@ -101,7 +175,7 @@ async def get_teacher_by_id(
     operation_id="patch_update_teacher",
 )
 async def update_useraccount(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
     updated_teacher: TeacherUpdate,
     db: Annotated[AsyncSession, Depends(get_async_db)],
 ):
@@ -116,6 +190,20 @@ async def update_useraccount(
     return new_updated_teacher
 
 
+@teacher_router.patch(
+    "/batch-update",
+    summary="Update many teachers in one call",
+    dependencies=[Depends(admin_access)],
+    operation_id="patch_batch_update_teachers",
+)
+async def batch_update_useraccounts(
+    updates: List[TeacherBatchUpdate],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    results = await update_teacher_batch(teacher_updates=updates, db=db)
+    return {"results": results}
+
+
 @teacher_router.delete(
     "/delete/{teacher_id}",
     summary="delete a user account using its ID",
@@ -164,31 +252,125 @@ async def upload_file(
     file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        # Step 1: Save file to the file system
-        contents = await file.read()
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(contents)
-
-        # Step 2: Save file metadata to the database
-        new_file = FileModel(filename=file.filename, filepath=file_path)
-        db.add(new_file)
-        await db.commit()
-        await db.refresh(new_file)
-
-        return {"filename": new_file.filename, "file_id": new_file.id}
+        filename = safe_filename(file.filename)
+
+        # Step 1: Stream the file to the file system in chunks
+        received_path, size, sha256 = await save_upload_file(file)
+
+        # Step 2: Store the content once and save file metadata to the database
+        new_file = await record_uploaded_file(
+            db, filename=filename, sha256=sha256, size=size, source=received_path
+        )
+
+        return _uploaded(new_file, size)
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+async def get_uploader(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    if principal.role == Role.STUDENT:
+        raise HTTPException(status_code=403, detail="Not allowed to upload files")
+    return principal
+
+
+@teacher_router.post(
+    "/uploads/",
+    summary="Start a resumable upload",
+    operation_id="post_upload_session",
+)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    uploader: Annotated[Principal, Depends(get_uploader)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    # content the store already holds is recorded without sending a byte
+    if upload.sha256 and await find_blob(db, upload.sha256, upload.size):
+        new_file = await record_uploaded_file(
+            db,
+            filename=safe_filename(upload.filename),
+            sha256=upload.sha256,
+            size=upload.size,
+        )
+        return _uploaded(new_file, upload.size)
+
+    session = await upload_sessions.create(upload.filename, upload.size, uploader.id)
+    return {**session.describe(), "chunk_size": settings.UPLOAD_CHUNK_SIZE}
+
+
+@teacher_router.get(
+    "/uploads/{upload_id}",
+    summary="How much of a resumable upload has arrived",
+    operation_id="get_upload_session",
+)
+async def get_upload_session(
+    upload_id: str, uploader: Annotated[Principal, Depends(get_uploader)]
+):
+    return upload_sessions.get(upload_id, uploader.id).describe()
+
+
+@teacher_router.put(
+    "/uploads/{upload_id}",
+    summary="Send the next part of a resumable upload as the raw request body",
+    operation_id="put_upload_chunk",
+)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    uploader: Annotated[Principal, Depends(get_uploader)],
+    offset: int = Query(..., ge=0, description="Byte position the body starts at"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    session = upload_sessions.get(upload_id, uploader.id)
+    try:
+        await upload_sessions.append(session, offset, request.stream())
+    except ClientDisconnect:
+        # the client asks for the offset and resumes from there
+        logger.info(f"Upload {upload_id} interrupted at {session.offset} bytes")
+        return Response(status_code=400)
+
+    if session.offset < session.size:
+        return session.describe()
+
+    received_path, size, sha256 = upload_sessions.complete(session)
+    new_file = await record_uploaded_file(
+        db, filename=session.filename, sha256=sha256, size=size, source=received_path
+    )
+    return _uploaded(new_file, size)
+
+
+@teacher_router.delete(
+    "/uploads/{upload_id}",
+    summary="Abandon a resumable upload",
+    operation_id="delete_upload_session",
+)
+async def delete_upload_session(
+    upload_id: str, uploader: Annotated[Principal, Depends(get_uploader)]
+):
+    await upload_sessions.discard(upload_sessions.get(upload_id, uploader.id))
+    return {"detail": "Upload discarded"}
+
+
 @teacher_router.get("/list/")
-async def list_files(db: AsyncSession = Depends(get_async_db)):
+@conditional_response(_files_version)
+@cache_response("files")
+async def list_files(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    since: Optional[datetime] = SINCE_QUERY,
+):
     """
     Fetch the list of uploaded files from the database.
     """
     try:
+        # with a cursor only the changes are sent: {files, deleted, next_since}
+        if since is not None:
+            return await get_file_changes(db, since)
+
         # Fetch files from the database using the service function
         files = await list_uploaded_files(db)
         return {"files": files}
@@ -196,15 +378,99 @@ async def list_files(db: AsyncSession = Depends(get_async_db)):
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+@teacher_router.delete(
+    "/files/{file_id}",
+    summary="Delete a sent file, its content goes when nothing else uses it",
+    operation_id="delete_file",
+)
+async def delete_file(
+    file_id: int,
+    principal: Annotated[Principal, Depends(get_current_principal)],
+    db: AsyncSession = Depends(get_async_db),
+):
+    if principal.role == Role.STUDENT:
+        raise HTTPException(status_code=403, detail="Not allowed to delete files")
+    await delete_uploaded_file(db, file_id)
+    return {"detail": "File deleted", "file_id": file_id}
+
+
+@teacher_router.get(
+    "/files/{file_id}/thumbnail",
+    summary="Small JPEG preview of an uploaded image or video",
+    operation_id="get_file_thumbnail",
+)
+async def get_file_thumbnail(
+    file_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    file = await db.scalar(
+        select(FileModel).where(
+            FileModel.id == file_id, FileModel.is_deleted.is_(False)
+        )
+    )
+    if file is None or file.blob_sha256 is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    path = thumbnail_path(file.blob_sha256)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        # not made yet (or the job failed): make sure one is queued
+        await request_thumbnail(file.blob_sha256, file.filename)
+        raise HTTPException(status_code=404, detail="No thumbnail for this file")
+
+    # the content behind a file id never changes, neither does its thumbnail
+    response = FileResponse(
+        path=path,
+        media_type="image/jpeg",
+        stat_result=stat_result,
+        headers={"Cache-Control": "max-age=86400"},
+    )
+    if is_not_modified(request.headers, response.headers):
+        return Response(
+            status_code=304,
+            headers={
+                name: response.headers[name] for name in ("etag", "cache-control")
+            },
+        )
+    return response
+
+
 @teacher_router.get("/download/{filename}")
-async def download_file(filename: str):
+async def download_file(
+    filename: str,
+    request: Request,
+    file_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    file = await get_uploaded_file(db, safe_filename(filename), file_id)
+    if file is None:
+        raise HTTPException(status_code=404, detail="File not found")
     try:
-        file_path = os.path.join("uploads", filename)
-        if os.path.exists(file_path):
-            return FileResponse(
-                path=file_path, filename=filename, media_type="application/octet-stream"
-            )
-        else:
-            raise HTTPException(status_code=404, detail="File not found")
-    except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        stat_result = await run_in_threadpool(os.stat, file.filepath)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # stored content never changes, so its hash is the strongest validator
+    headers = {"Cache-Control": "no-cache"}
+    if file.blob_sha256:
+        headers["ETag"] = f'"{file.blob_sha256}"'
+
+    # FileResponse answers Range / If-Range requests with 206 and sets ETag and
+    # Last-Modified; where the server supports the ASGI pathsend extension the
+    # file is handed to it for zero-copy sending instead of being read here
+    response = FileResponse(
+        path=file.filepath,
+        filename=file.filename,
+        media_type="application/octet-stream",
+        stat_result=stat_result,
+        headers=headers,
+    )
+    if is_not_modified(request.headers, response.headers):
+        return Response(
+            status_code=304,
+            headers={
+                name: response.headers[name]
+                for name in ("etag", "last-modified", "cache-control")
+            },
+        )
+    return response
@@ -1,7 +1,8 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from core.enums import Gender, TeacherEducationLevel
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class MessageSchema(BaseModel):
@@ -15,6 +16,7 @@ class MessageCreate(BaseModel):
 
 
 class MessageResponse(BaseModel):
+    id: Optional[int] = None
     content: str
     sender: str
 
@@ -25,6 +27,9 @@ class MessageResponse(BaseModel):
 class ChatHistoryResponse(BaseModel):
     teacher_id: int
     messages: List[MessageResponse]
+    # only set for a "since" sync
+    deleted: List[int] = []
+    next_since: Optional[datetime] = None
 
 
 class ReplyResponse(BaseModel):
@@ -44,6 +49,25 @@ class TeacherUpdate(BaseModel):
     teacher_current_academic_level: TeacherEducationLevel
 
 
+class TeacherBatchUpdate(BaseModel):
+    """One row of a batch update: the teacher id and only the fields to change."""
+
+    id: int
+    teaching_subject: Optional[str] = None
+    teacher_id_number: Optional[str] = None
+    teacher_gender: Optional[Gender] = None
+    teacher_next_of_kin: Optional[str] = None
+    teacher_current_academic_level: Optional[TeacherEducationLevel] = None
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    # total bytes the client is going to send
+    size: int = Field(ge=0)
+    # content hash; when the server already stores it nothing has to be sent
+    sha256: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
+
+
 class Response(BaseModel):
     admin_id: str = "admin"
     content: str
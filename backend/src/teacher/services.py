@@ -1,7 +1,14 @@
 import datetime
 from typing import List, Optional
 
+from auth.utils import invalidate_cached_user
+from core.batch import update_users_batch
+from core.broadcast import broadcaster
+from core.cache import response_cache
 from core.models import Role, User
+from core.pagination import PageParams, paginate
+from core.sync import get_changes_since
+from core.tasks import task_queue
 from fastapi import HTTPException
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,8 +17,10 @@ from sqlalchemy.orm import joinedload
 from teacher.models import Conversation, Messages
 from teacher.schemas import MessageCreate
 
+from .blobs import add_file, remove_file
 from .models import File
-from .schemas import TeacherUpdate
+from .thumbnails import media_type, request_thumbnail
+from .schemas import TeacherBatchUpdate, TeacherUpdate
 
 
 async def get_all_conversations(db: AsyncSession):
@@ -28,6 +37,14 @@ async def get_chat_history(db: AsyncSession, teacher_id: int):
     return result.scalars().all()
 
 
+async def get_chat_history_changes(
+    db: AsyncSession, teacher_id: int, since: datetime.datetime
+) -> dict:
+    return await get_changes_since(
+        db, select(Messages).where(Messages.teacher_id == teacher_id), Messages, since
+    )
+
+
 async def save_message(db: AsyncSession, message_data: MessageCreate):
     message = Messages(
         teacher_id=message_data.teacher_id,
@@ -37,6 +54,17 @@ async def save_message(db: AsyncSession, message_data: MessageCreate):
     db.add(message)
     await db.commit()
     await db.refresh(message)
+    broadcaster.publish(
+        "teacher_messages",
+        {
+            "id": message.id,
+            "teacher_id": message.teacher_id,
+            "sender": message.sender,
+            "content": message.content,
+        },
+        # a teacher's conversation is nobody else's business
+        recipient_id=message.teacher_id,
+    )
     return message
 
 
@@ -44,14 +72,68 @@ async def list_uploaded_files(db: AsyncSession):
     """
     Fetch the list of files stored in the database.
     """
-    result = await db.execute(select(File))
+    result = await db.execute(select(File).where(File.is_deleted.is_(False)))
     files = result.scalars().all()
 
     # Convert files to a serializable format
-    return [
-        {"id": file.id, "filename": file.filename, "filepath": file.filepath}
-        for file in files
-    ]
+    return [_serialize_file(file) for file in files]
+
+
+async def record_uploaded_file(
+    db: AsyncSession,
+    filename: str,
+    sha256: str,
+    size: int,
+    source: Optional[str] = None,
+) -> File:
+    new_file = await add_file(db, filename, sha256, size, source=source)
+    await response_cache.invalidate("files")
+    broadcaster.publish("files", _serialize_file(new_file))
+    # previews are made after the response, see teacher/thumbnails.py
+    await request_thumbnail(new_file.blob_sha256, new_file.filename)
+    return new_file
+
+
+async def get_uploaded_file(
+    db: AsyncSession, filename: str, file_id: Optional[int] = None
+) -> Optional[File]:
+    # the same name can be sent many times, the newest send wins
+    query = select(File).where(File.filename == filename, File.is_deleted.is_(False))
+    if file_id is not None:
+        query = query.where(File.id == file_id)
+    return await db.scalar(query.order_by(File.id.desc()).limit(1))
+
+
+async def delete_uploaded_file(db: AsyncSession, file_id: int) -> File:
+    file = await db.scalar(
+        select(File).where(File.id == file_id, File.is_deleted.is_(False))
+    )
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if await remove_file(db, file):
+        await task_queue.enqueue("teacher.discard_thumbnail", sha256=file.blob_sha256)
+    await response_cache.invalidate("files")
+    return file
+
+
+async def get_file_changes(db: AsyncSession, since: datetime.datetime) -> dict:
+    changes = await get_changes_since(db, select(File), File, since)
+    return {
+        "files": [_serialize_file(file) for file in changes["items"]],
+        "deleted": changes["deleted"],
+        "next_since": changes["next_since"],
+    }
+
+
+def _serialize_file(file: File) -> dict:
+    return {
+        "id": file.id,
+        "filename": file.filename,
+        "filepath": file.filepath,
+        # lets list screens ask for a thumbnail only where one can exist
+        "media_type": media_type(file.filename),
+    }
 
 
 async def get_replies(db: AsyncSession, teacher_id: int):
@@ -63,12 +145,10 @@ async def get_replies(db: AsyncSession, teacher_id: int):
     return result.scalars().all()
 
 
-async def get_all_teachers(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> List[User]:
-    query = select(User).where(User.role == Role.TEACHER).offset(skip).limit(limit)
-    users = await db.execute(query)
-    return users.scalars().all()
+async def get_all_teachers(db: AsyncSession, page: PageParams, columns: List) -> dict:
+    # project only the requested columns: no password hash, no relationship loads
+    query = select(*columns).where(User.role == Role.TEACHER)
+    return await paginate(db, query, User.id, page, as_mappings=True)
 
 
 async def get_teacher_account_by_id(
@@ -98,31 +178,15 @@ async def update_teacher_account(
 
     db.add(teacher)
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
     return teacher
 
 
 async def update_teacher_batch(
-    teacher_updates: List[TeacherUpdate], db: AsyncSession
-) -> List[User]:
-    updated_teachers = []
-    for update_data in teacher_updates:
-        teacher = await get_teacher_account_by_id(teacher_id=update_data.id, db=db)
-        if not teacher:
-            continue  # Skip if teacher not found
-
-        # Update only fields with new values
-        for field, value in update_data.model_dump(exclude_unset=True).items():
-            setattr(teacher, field, value)
-
-        db.add(teacher)
-        updated_teachers.append(teacher)
-
-    await db.commit()  # Commit all updates at once
-    for teacher in updated_teachers:
-        await db.refresh(teacher)  # Refresh to get updated data
-
-    return updated_teachers
+    teacher_updates: List[TeacherBatchUpdate], db: AsyncSession
+) -> List[dict]:
+    return await update_users_batch(db=db, role=Role.TEACHER, updates=teacher_updates)
 
 
 async def reset(teacher_id: int, teacher_in: TeacherUpdate, db: AsyncSession) -> User:
@@ -136,6 +200,7 @@ async def reset(teacher_id: int, teacher_in: TeacherUpdate, db: AsyncSession) ->
 
     db.add(teacher)
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
     return teacher
 
@@ -148,6 +213,7 @@ async def remove_teacher_by_id(id: int, db: AsyncSession) -> User:
 
     teacher.is_deleted = True
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
     return teacher
 
@@ -160,6 +226,7 @@ async def set_teacher_account_status(db: AsyncSession, id: int) -> User:
 
     teacher.is_active = not teacher.is_active
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
     return teacher
 
@@ -176,6 +243,7 @@ async def check_out_teacher(teacher_id: int, db: AsyncSession) -> bool:
 
     db.add(teacher)
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
     return True
 
@@ -196,6 +264,7 @@ async def check_in_teacher(teacher_id: int, db: AsyncSession):
     # Add the updated teacher back to the session and commit the changes
     db.add(teacher)
     await db.commit()
+    invalidate_cached_user(teacher.id)
     await db.refresh(teacher)
 
     return True
@@ -0,0 +1,156 @@
+"""Small previews of uploaded images and videos, made by background tasks.
+
+Thumbnails are JPEGs keyed by the content's SHA-256, so a file sent to many
+classes is previewed once. Images need Pillow and video poster frames need an
+ffmpeg binary on PATH; without them those previews are simply not made.
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import shutil
+from typing import Optional, Set
+
+from core.config import settings
+from core.tasks import task_queue
+from starlette.concurrency import run_in_threadpool
+
+from .blobs import blob_path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: no image thumbnails without Pillow
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = "thumbnails"
+
+
+def media_type(filename: str) -> Optional[str]:
+    return mimetypes.guess_type(filename)[0]
+
+
+def preview_kind(filename: str) -> Optional[str]:
+    """ "image" or "video" for files that get a thumbnail, else None."""
+    kind = (media_type(filename) or "").split("/")[0]
+    return kind if kind in ("image", "video") else None
+
+
+def thumbnail_path(sha256: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, THUMBNAIL_DIR, sha256[:2], f"{sha256}.jpg")
+
+
+def _image_thumbnail(source: str, destination: str) -> bool:
+    if Image is None:
+        return False
+    size = int(settings.THUMBNAIL_SIZE)
+    try:
+        image = Image.open(source)
+    except (Image.UnidentifiedImageError, OSError) as e:
+        # not an image Pillow can read, retrying will not change that
+        logger.info(f"No thumbnail for {source}: {e}")
+        return False
+    with image:
+        # JPEGs decode straight at a reduced scale instead of full resolution
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        image.convert("RGB").save(
+            destination, "JPEG", quality=int(settings.THUMBNAIL_QUALITY), optimize=True
+        )
+    return True
+
+
+async def _video_poster(source: str, destination: str) -> bool:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return False
+    size = int(settings.THUMBNAIL_SIZE)
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg,
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        source,
+        # "thumbnail" picks a representative frame out of the first few
+        "-vf",
+        f"thumbnail,scale={size}:{size}:force_original_aspect_ratio=decrease",
+        "-frames:v",
+        "1",
+        "-f",
+        "image2",
+        destination,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(
+            process.communicate(), timeout=settings.THUMBNAIL_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning(f"Poster frame for {source} timed out")
+        return False
+    if process.returncode != 0:
+        logger.warning(f"Poster frame for {source} failed: {stderr.decode()[:200]}")
+        return False
+    return True
+
+
+async def make_thumbnail(sha256: str, kind: str) -> bool:
+    destination = thumbnail_path(sha256)
+    if await run_in_threadpool(os.path.exists, destination):
+        return True
+
+    await run_in_threadpool(os.makedirs, os.path.dirname(destination), exist_ok=True)
+    # written aside and renamed, so the endpoint never serves half a JPEG
+    partial = f"{destination}.part"
+    try:
+        if kind == "image":
+            made = await run_in_threadpool(_image_thumbnail, blob_path(sha256), partial)
+        else:
+            made = await _video_poster(blob_path(sha256), partial)
+        if made:
+            await run_in_threadpool(os.replace, partial, destination)
+        return made
+    finally:
+        await run_in_threadpool(_unlink, partial)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@task_queue.task("teacher.discard_thumbnail")
+async def discard_thumbnail(sha256: str) -> None:
+    await run_in_threadpool(_unlink, thumbnail_path(sha256))
+
+
+# thumbnails asked for and not made yet, so repeated requests queue one job
+_requested: Set[str] = set()
+
+
+@task_queue.task("teacher.thumbnail")
+async def generate_thumbnail(sha256: str, kind: str) -> None:
+    try:
+        await make_thumbnail(sha256, kind)
+    finally:
+        _requested.discard(sha256)
+
+
+async def request_thumbnail(sha256: Optional[str], filename: str) -> bool:
+    """Queue a thumbnail for ``filename``'s content; False if it gets none."""
+    kind = preview_kind(filename)
+    if sha256 is None or kind is None:
+        return False
+    if sha256 not in _requested:
+        _requested.add(sha256)
+        await task_queue.enqueue("teacher.thumbnail", sha256=sha256, kind=kind)
+    return True
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from core.config import settings
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# uploads are received here, then moved into the blob store (see blobs.py)
+SESSION_DIR = ".sessions"
+
+
+def safe_filename(filename: str) -> str:
+    # never let a client-supplied name escape the upload directory
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid file name")
+    return name
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"File is larger than the {limit} byte limit"
+    )
+
+
+def _append(path: str, data: bytes, digest) -> None:
+    # runs on a worker thread: hashing and disk IO stay off the event loop
+    digest.update(data)
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _staging_path(name: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, SESSION_DIR, f"{name}.part")
+
+
+async def save_upload_file(file: UploadFile) -> Tuple[str, int, str]:
+    """Copy a multipart upload to the staging directory chunk by chunk.
+
+    Returns (path, size, sha256) of the received copy, ready to be handed to
+    the blob store. A failed or oversized upload leaves nothing behind.
+    """
+    partial = _staging_path(uuid.uuid4().hex)
+    await run_in_threadpool(os.makedirs, os.path.dirname(partial), exist_ok=True)
+
+    digest, size = hashlib.sha256(), 0
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_BYTES:
+                raise _too_large(settings.UPLOAD_MAX_BYTES)
+            await run_in_threadpool(_append, partial, chunk, digest)
+        if not size:
+            # an empty upload still produces an (empty) file
+            await run_in_threadpool(_append, partial, b"", digest)
+    except BaseException:
+        await run_in_threadpool(_remove, partial)
+        raise
+
+    return partial, size, digest.hexdigest()
+
+
+@dataclass
+class UploadSession:
+    id: str
+    filename: str
+    size: int
+    path: str
+    # id of the principal that opened it, nobody else may see or touch it
+    owner_id: int
+    offset: int = 0
+    digest: Any = field(default_factory=hashlib.sha256)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    touched: float = field(default_factory=time.monotonic)
+
+    def describe(self) -> dict:
+        return {"upload_id": self.id, "offset": self.offset, "size": self.size}
+
+
+class UploadSessions:
+    """Resumable uploads: the client declares the size, then sends the bytes
+    in as many requests as its connection allows.
+
+    Every request carries the offset it starts at. After an interrupted
+    request the client asks for the session's offset and continues from
+    there; bytes are hashed as they arrive so completing an upload never
+    rereads the file. Sessions are kept in process memory, so a restart
+    means starting the upload over.
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, UploadSession] = {}
+
+    async def create(self, filename: str, size: int, owner_id: int) -> UploadSession:
+        filename = safe_filename(filename)
+        if size > settings.UPLOAD_MAX_BYTES:
+            raise _too_large(settings.UPLOAD_MAX_BYTES)
+        await self._expire()
+
+        upload_id = uuid.uuid4().hex
+        session = UploadSession(
+            id=upload_id,
+            filename=filename,
+            size=size,
+            path=_staging_path(upload_id),
+            owner_id=owner_id,
+        )
+        await run_in_threadpool(
+            os.makedirs, os.path.dirname(session.path), exist_ok=True
+        )
+        # the partial file exists from the start so appends never race a create
+        await run_in_threadpool(_append, session.path, b"", session.digest)
+        self.sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str, owner_id: int) -> UploadSession:
+        session = self.sessions.get(upload_id)
+        # someone else's session looks exactly like a missing one
+        if session is None or session.owner_id != owner_id:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return session
+
+    async def append(
+        self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]
+    ) -> UploadSession:
+        """Stream one request body into the session starting at ``offset``."""
+        async with session.lock:
+            if offset != session.offset:
+                raise HTTPException(
+                    status_code=409,
+                    detail={
+                        "message": "Upload offset does not match",
+                        "offset": session.offset,
+                    },
+                )
+
+            buffer = bytearray()
+            try:
+                async for chunk in chunks:
+                    if session.offset + len(buffer) + len(chunk) > session.size:
+                        raise _too_large(session.size)
+                    buffer += chunk
+                    if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                        await self._flush(session, buffer)
+                        buffer = bytearray()
+            finally:
+                # keep whatever arrived before a disconnect, it need not be resent
+                if buffer:
+                    await self._flush(session, buffer)
+                session.touched = time.monotonic()
+        return session
+
+    def complete(self, session: UploadSession) -> Tuple[str, int, str]:
+        """Close a fully received upload; returns (path, size, sha256) of the
+        received copy, ready to be handed to the blob store."""
+        self.sessions.pop(session.id, None)
+        return session.path, session.size, session.digest.hexdigest()
+
+    async def discard(self, session: UploadSession) -> None:
+        self.sessions.pop(session.id, None)
+        await run_in_threadpool(_remove, session.path)
+
+    async def _flush(self, session: UploadSession, data: bytearray) -> None:
+        await run_in_threadpool(_append, session.path, bytes(data), session.digest)
+        session.offset += len(data)
+
+    async def _expire(self) -> None:
+        cutoff = time.monotonic() - settings.UPLOAD_SESSION_TTL_SECONDS
+        for session in list(self.sessions.values()):
+            if session.touched < cutoff and not session.lock.locked():
+                logger.info(f"Discarding stale upload session {session.id}")
+                await self.discard(session)
+
+
+upload_sessions = UploadSessions()
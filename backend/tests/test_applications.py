@@ -0,0 +1,136 @@
+from application.enums import ApplicationStatus
+from application.models import Application
+from core.models import User
+from database.core import async_engine
+from sqlalchemy import event, insert, inspect, select
+from subject.enums import Grades, SubjectNames
+from subject.models import Subject
+
+
+def _seed_applications(login, database, first_names, last_name):
+    """A sent, an approved and a deleted sent application, returns their ids.
+
+    Only the approved one includes GEOGRAPHY.
+    """
+    seeded = zip(
+        first_names,
+        [ApplicationStatus.SENT, ApplicationStatus.APPROVED, ApplicationStatus.SENT],
+        [False, False, True],
+    )
+    ids = []
+    for first_name, status, is_deleted in seeded:
+        login("STUDENT", first_name=first_name, last_name=last_name)
+        # the user that login() just registered
+        (user_id,) = database(select(User.id).order_by(User.id.desc()).limit(1))[0]
+        (application_id,) = database(
+            insert(Application)
+            .values(applicant_id=user_id, status=status, is_deleted=is_deleted)
+            .returning(Application.id)
+        )[0]
+        ids.append(application_id)
+    database(
+        insert(Subject).values(
+            name=SubjectNames.GEOGRAPHY,
+            grade=Grades.A,
+            application_id=ids[1],
+            is_deleted=False,
+        )
+    )
+    return ids
+
+
+def _ids(response):
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json()["items"]]
+
+
+def test_application_queue_filters(client, login, database):
+    quentin, queenie, quincy = _seed_applications(
+        login, database, ("Quentin", "Queenie", "Quincy"), "Queue"
+    )
+    login("ADMIN")
+
+    def queue(**params):
+        return _ids(client.get("/application/", params=params))
+
+    # soft-deleted applications only show up on request
+    assert queue(applicant_name="qu") == [quentin, queenie]
+    assert queue(applicant_name="qu", include_deleted=True) == [
+        quentin,
+        queenie,
+        quincy,
+    ]
+    # the prefix matches first or last names, case-insensitively
+    assert queue(applicant_name="QUEEN") == [queenie]
+    assert queue(applicant_name="queue") == [quentin, queenie]
+    assert queue(applicant_name="qu", status="SENT") == [quentin]
+    assert queue(applicant_name="qu", subject="GEOGRAPHY") == [queenie]
+    assert queue(applicant_name="qu", created_to="2000-01-01T00:00:00") == []
+
+
+def test_application_queue_pages_newest_first(client, login, database):
+    seeded = _seed_applications(login, database, ("Ada", "Bea", "Cy"), "Pager")
+    login("ADMIN")
+
+    pages, cursor = [], None
+    while True:
+        params = {"order": "desc", "limit": 1, "include_deleted": True}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/application/", params=params)
+        pages.extend(_ids(response))
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == sorted(pages, reverse=True)
+    assert set(seeded) <= set(pages)
+
+
+def test_application_queue_indexes_exist(client):
+    from database.core import async_engine
+
+    def index_columns(sync_conn):
+        indexes = inspect(sync_conn).get_indexes(
+            Application.__tablename__, schema=Application.__table__.schema
+        )
+        return [index["column_names"] for index in indexes]
+
+    async def read():
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(index_columns)
+
+    columns = client.portal.call(read)
+    assert ["status", "is_deleted", "created_at"] in columns
+    assert ["applicant_id"] in columns
+
+
+def test_batch_status_reports_rows_changed_concurrently(client, login, database):
+    kept, raced, _ = _seed_applications(
+        login, database, ("Rae", "Rory", "Rita"), "Race"
+    )
+    login("ADMIN")
+
+    table = Application.__table__.fullname
+    raced_once = []
+
+    def race(conn, cursor, statement, parameters, context, executemany):
+        # another admin reopens one of them just before the guarded UPDATE
+        if statement.startswith(f"UPDATE {table} SET status") and not raced_once:
+            raced_once.append(raced)
+            cursor.execute(f"UPDATE {table} SET status = 'PENDING' WHERE id = {raced}")
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", race)
+    try:
+        response = client.patch(
+            "/application/batch-status",
+            json={"application_ids": [kept, raced], "status": "PENDING"},
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", race)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["results"] == [
+        {"id": kept, "status": "PENDING", "outcome": "updated"},
+        {"id": raced, "status": "PENDING", "outcome": "unchanged"},
+    ]
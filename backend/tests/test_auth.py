@@ -0,0 +1,65 @@
+import asyncio
+
+import auth.utils as auth_utils
+from auth.utils import get_current_user
+from core.models import User
+from database.core import AsyncSessionLocal
+from passlib.hash import bcrypt
+from sqlalchemy import select, update
+
+
+def test_current_user_is_loaded_into_each_session(client, login):
+    token = login("STUDENT")
+
+    async def resolve():
+        async with AsyncSessionLocal() as session:
+            user = await get_current_user(db_session=session, access_token=token)
+            # relationships need the user to belong to this session
+            return user in session, await user.awaitable_attrs.subject_associations
+
+    # the second call finds the token and principal caches warm
+    for _ in range(2):
+        in_session, associations = client.portal.call(resolve)
+        assert in_session
+        assert associations == []
+
+
+def test_login_rehashes_a_password_with_another_cost(client, login, database):
+    login("STUDENT")
+    (email,) = database(select(User.email).order_by(User.id.desc()).limit(1))[0]
+    database(
+        update(User)
+        .where(User.email == email)
+        .values(password=bcrypt.using(rounds=5).hash("password"))
+    )
+
+    response = client.post(
+        "/login",
+        data=dict(username=email, password="password"),
+        follow_redirects=False,
+    )
+    assert response.status_code == 303, response.text
+
+    (stored,) = database(select(User.password).where(User.email == email))[0]
+    # PASSWORD_BCRYPT_ROUNDS is 4 in the test settings
+    assert stored.startswith("$2b$04$")
+    assert bcrypt.verify("password", stored)
+
+
+def test_saturated_hashing_pool_answers_503(client, monkeypatch):
+    # every worker busy and the queue full
+    monkeypatch.setattr(auth_utils, "_hash_slots", asyncio.Semaphore(0))
+
+    response = client.post(
+        "/register",
+        data=dict(
+            first_name="Busy",
+            last_name="Hour",
+            email="busy@example.com",
+            password="password",
+            phone_number="0000",
+        ),
+        follow_redirects=False,
+    )
+    assert response.status_code == 503, response.text
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,26 @@
+from core.broadcast import Broadcaster
+from core.enums import Role
+
+
+def _channels(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait().split("\n")[1].removeprefix("event: "))
+    return events
+
+
+def test_teacher_messages_only_reach_their_teacher_and_admins():
+    broadcaster = Broadcaster(queue_size=10)
+    with (
+        broadcaster.subscribe(["teacher_messages"], 1, Role.TEACHER) as own,
+        broadcaster.subscribe(["teacher_messages"], 2, Role.TEACHER) as other,
+        broadcaster.subscribe(["teacher_messages"], 3, Role.ADMIN) as admin,
+        broadcaster.subscribe(["files"], 2, Role.TEACHER) as files,
+    ):
+        broadcaster.publish("teacher_messages", {"content": "hi"}, recipient_id=1)
+        broadcaster.publish("files", {"filename": "notes.txt"})
+
+        assert _channels(own) == ["teacher_messages"]
+        assert _channels(other) == []
+        assert _channels(admin) == ["teacher_messages"]
+        assert _channels(files) == ["files"]
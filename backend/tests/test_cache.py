@@ -0,0 +1,85 @@
+import asyncio
+
+import core.cache as cache
+import pytest
+from core.cache import TTLCache, cache_response, response_cache
+from core.config import settings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_expires_entries(clock):
+    entries = TTLCache(maxsize=10, ttl=5)
+    entries.set("a", 1)
+    entries.set("b", 2, ttl=60)
+    entries.set("c", 3, ttl=0)
+
+    assert entries.get("a") == 1
+    assert entries.get("c") is None
+
+    clock[0] += 5
+    assert entries.get("a") is None
+    assert entries.get("b") == 2
+    assert entries.pop("b") == 2
+    assert len(entries) == 0
+
+
+def test_ttl_cache_evicts_the_least_recently_used(clock):
+    entries = TTLCache(maxsize=2, ttl=5)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+
+    assert entries.keys() == ["a", "c"]
+
+
+def test_memory_cache_defaults_to_a_short_ttl():
+    assert int(settings.CACHE_MEMORY_TTL_SECONDS) <= 10
+
+
+@pytest.fixture
+def cached_endpoint(monkeypatch, clock):
+    monkeypatch.setattr(settings, "REDIS_CACHE_ENABLED", True)
+    calls = []
+
+    @cache_response("test-cache")
+    async def endpoint(page: int = 1, since=None, cursor=None):
+        calls.append((page, since, cursor))
+        return {"page": page, "call": len(calls)}
+
+    yield endpoint, calls
+    asyncio.run(response_cache.invalidate("test-cache"))
+
+
+def test_cache_response_serves_hits_until_expiry(cached_endpoint, clock):
+    endpoint, calls = cached_endpoint
+
+    assert asyncio.run(endpoint(page=1)) == {"page": 1, "call": 1}
+    assert asyncio.run(endpoint(page=1)) == {"page": 1, "call": 1}
+    assert asyncio.run(endpoint(page=2)) == {"page": 2, "call": 2}
+
+    clock[0] += int(settings.CACHE_MEMORY_TTL_SECONDS)
+    assert asyncio.run(endpoint(page=1)) == {"page": 1, "call": 3}
+
+
+def test_cache_response_is_invalidated_by_namespace(cached_endpoint):
+    endpoint, calls = cached_endpoint
+
+    asyncio.run(endpoint(page=1))
+    asyncio.run(response_cache.invalidate("test-cache"))
+    assert asyncio.run(endpoint(page=1)) == {"page": 1, "call": 2}
+
+
+def test_cache_response_passes_change_feeds_through(cached_endpoint):
+    endpoint, calls = cached_endpoint
+
+    for _ in range(2):
+        asyncio.run(endpoint(since="2026-01-01T00:00:00"))
+        asyncio.run(endpoint(cursor="abc"))
+    assert len(calls) == 4
@@ -0,0 +1,52 @@
+from core.models import User
+from messages.models import Message
+from sqlalchemy import delete, insert, select, update
+
+
+def _etag(response):
+    assert response.status_code == 200, response.text
+    return response.headers["etag"]
+
+
+def test_me_etag_follows_every_write_to_the_user(client, login, database):
+    login("ADMIN")
+    response = client.post(
+        "/subjects/add_many",
+        json={
+            "subjects": [{"name": "BIOLOGY", "grade": "A"}],
+            "on_conflict": "skip",
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    login("STUDENT", first_name="Etta")
+    (user_id,) = database(select(User.id).order_by(User.id.desc()).limit(1))[0]
+    tags = [_etag(client.get("/me"))]
+
+    # two edits well within a second, as another worker would make them
+    for last_name in ("Once", "Twice"):
+        database(update(User).where(User.id == user_id).values(last_name=last_name))
+        tags.append(_etag(client.get("/me")))
+
+    response = client.post(
+        "/student-subject/add-student-subject",
+        json={"name": "BIOLOGY", "grade": "B"},
+    )
+    assert response.status_code == 200, response.text
+    tags.append(_etag(client.get("/me")))
+
+    assert len(set(tags)) == len(tags)
+    response = client.get("/me", headers={"If-None-Match": tags[-1]})
+    assert response.status_code == 304
+
+
+def test_table_etag_sees_a_row_replaced_within_a_second(client, login, database):
+    login("ADMIN")
+    database(insert(Message).values(message="older"))
+    database(insert(Message).values(message="newer"))
+    before = _etag(client.get("/message/"))
+
+    # same count, and likely the same whole-second created_at
+    database(delete(Message).where(Message.message == "older"))
+    database(insert(Message).values(message="newest"))
+    assert _etag(client.get("/message/")) != before
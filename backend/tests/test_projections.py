@@ -0,0 +1,30 @@
+from core.enums import Role
+from core.models import User
+from core.projections import USER_LIST_FIELDS
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+
+def test_projected_list_matches_full_rows(client, login, database):
+    for _ in range(3):
+        login("STUDENT")
+    login("ADMIN")
+
+    fields = [name for name in USER_LIST_FIELDS if name not in ("role", "id")]
+    response = client.get(
+        "/student/", params={"fields": ",".join(fields), "limit": 100}
+    )
+    assert response.status_code == 200, response.text
+    items = response.json()["items"]
+
+    students = {
+        user.id: user
+        for (user,) in database(select(User).where(User.role == Role.STUDENT))
+    }
+    assert [item["id"] for item in items] == sorted(students)
+    for item in items:
+        # the projection serializes exactly like the full model would
+        student = students[item["id"]]
+        assert item == jsonable_encoder(
+            {name: getattr(student, name) for name in ["id", *fields]}
+        )
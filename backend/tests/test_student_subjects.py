@@ -0,0 +1,80 @@
+from database.core import async_engine
+from sqlalchemy import event, insert
+from subject.enums import Grades, SubjectNames
+from subject.models import Subject
+
+
+def test_student_subjects_can_be_read_repeatedly(client, login):
+    login("ADMIN")
+    response = client.post(
+        "/subjects/add_many",
+        json={
+            "subjects": [{"name": "HISTORY", "grade": "A"}],
+            "on_conflict": "skip",
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    login("STUDENT")
+    response = client.post(
+        "/student-subject/add-student-subject",
+        json={"name": "HISTORY", "grade": "B"},
+    )
+    assert response.status_code == 200, response.text
+
+    # the second call is served from the principal cache
+    for _ in range(2):
+        response = client.get("/student-subject/get-student-subjects")
+        assert response.status_code == 200, response.text
+        assert response.json() == [{"name": "HISTORY", "grade": "B"}]
+
+
+def test_subject_created_by_another_worker_can_be_enrolled(client, login, database):
+    # written straight to the table, so this process' registry never saw it
+    database(
+        insert(Subject).values(
+            name=SubjectNames.NDEBELE, grade=Grades.C, is_deleted=False
+        )
+    )
+
+    login("STUDENT")
+    response = client.post(
+        "/student-subject/add-student-subject",
+        json={"name": "NDEBELE", "grade": "C"},
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.delete(
+        "/student-subject/remove-student-subject",
+        params={"subject_name": "NDEBELE"},
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_unknown_subjects_are_looked_up_in_one_query(client, login, database):
+    names = [SubjectNames.ACCOUNTS, SubjectNames.COMMERCE, SubjectNames.ECONOMICS]
+    # created behind the registry's back, as another worker would
+    for name in names:
+        database(insert(Subject).values(name=name, grade=Grades.B, is_deleted=False))
+    login("STUDENT")
+
+    subject_queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and (
+            f"FROM {Subject.__table__.fullname}" in statement
+        ):
+            subject_queries.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/student-subject/add-bulk-student-subjects",
+            json=[{"name": name.value, "grade": "B"} for name in names],
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()["results"]] == ["added"] * 3
+    assert len(subject_queries) == 1, subject_queries
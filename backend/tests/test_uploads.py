@@ -0,0 +1,32 @@
+def test_upload_sessions_need_an_uploader(client, login):
+    upload = {"filename": "notes.txt", "size": 5}
+
+    client.cookies.clear()
+    assert client.post("/teacher/uploads/", json=upload).status_code == 401
+
+    login("STUDENT")
+    assert client.post("/teacher/uploads/", json=upload).status_code == 403
+
+
+def test_upload_sessions_belong_to_their_owner(client, login):
+    login("TEACHER")
+    response = client.post(
+        "/teacher/uploads/", json={"filename": "notes.txt", "size": 5}
+    )
+    assert response.status_code == 200, response.text
+    upload_id = response.json()["upload_id"]
+    owner = client.cookies["access_token"]
+
+    # another teacher can neither see, extend nor abandon it
+    login("TEACHER")
+    url = f"/teacher/uploads/{upload_id}"
+    assert client.get(url).status_code == 404
+    assert client.put(url, params={"offset": 0}, content=b"hello").status_code == 404
+    assert client.delete(url).status_code == 404
+
+    client.cookies.clear()
+    client.cookies.set("access_token", owner)
+    assert client.get(url).json()["offset"] == 0
+    response = client.put(url, params={"offset": 0}, content=b"hello")
+    assert response.status_code == 200, response.text
+    assert client.get(url).status_code == 404
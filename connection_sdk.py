@@ -147,7 +147,11 @@ class ConnectionManager:
                 """
 import httpx
 from kivy.utils import platform
-from libs.applibs.utils import load_cookies, save_cookies  # noqa: F401
+from libs.applibs.utils import (  # noqa: F401
+    ETagCachingTransport,
+    load_cookies,
+    save_cookies,
+)
 
 online_server_url = "https://embakweaziwe.onrender.com"
 offline_server_url = "http://127.0.0.1:8000"
@@ -161,7 +165,8 @@ else:
 def create_client():
     # create a client session (client = create_client()) to use for that session (app lifetime)
     cookies = load_cookies()
-    return httpx.Client()
+    # conditional GETs: unchanged responses come back as a bodyless 304
+    return httpx.Client(transport=ETagCachingTransport())
 
 
 """
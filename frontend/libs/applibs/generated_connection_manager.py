@@ -1,6 +1,10 @@
 import httpx
 from kivy.utils import platform
-from libs.applibs.utils import load_cookies, save_cookies  # noqa: F401
+from libs.applibs.utils import (  # noqa: F401
+    ETagCachingTransport,
+    load_cookies,
+    save_cookies,
+)
 
 online_server_url = "https://embakweaziwe.onrender.com"
 offline_server_url = "http://127.0.0.1:8000"
@@ -15,7 +19,8 @@ else:
 def create_client():
     # create a client session (client = create_client()) to use for that session (app lifetime)
     cookies = load_cookies()
-    return httpx.Client()
+    # conditional GETs: unchanged responses come back as a bodyless 304
+    return httpx.Client(transport=ETagCachingTransport())
 
 
 class AuthRoutes:
@@ -354,6 +359,38 @@ class TeachersRoutes:
 
         return response
 
+    def post_upload_session(self, **kwargs):
+        """
+        Expected data: application/json
+        Schema: {'$ref': '#/components/schemas/UploadSessionCreate'}
+        """
+        response = self.client.post(
+            f"{server_url}/teacher/uploads/", follow_redirects=True, **kwargs
+        )
+
+        return response
+
+    def get_upload_session(self, upload_id, **kwargs):
+        response = self.client.get(
+            f"{server_url}/teacher/uploads/{upload_id}", follow_redirects=True, **kwargs
+        )
+
+        return response
+
+    def put_upload_chunk(self, upload_id, **kwargs):
+        response = self.client.put(
+            f"{server_url}/teacher/uploads/{upload_id}", follow_redirects=True, **kwargs
+        )
+
+        return response
+
+    def delete_upload_session(self, upload_id, **kwargs):
+        response = self.client.delete(
+            f"{server_url}/teacher/uploads/{upload_id}", follow_redirects=True, **kwargs
+        )
+
+        return response
+
     def list_files_teacher_list__get(self, **kwargs):
         response = self.client.get(
             f"{server_url}/teacher/list/", follow_redirects=True, **kwargs
@@ -361,6 +398,13 @@ class TeachersRoutes:
 
         return response
 
+    def delete_file(self, file_id, **kwargs):
+        response = self.client.delete(
+            f"{server_url}/teacher/files/{file_id}", follow_redirects=True, **kwargs
+        )
+
+        return response
+
     def download_file_teacher_download__filename__get(self, filename, **kwargs):
         response = self.client.get(
             f"{server_url}/teacher/download/{filename}", follow_redirects=True, **kwargs
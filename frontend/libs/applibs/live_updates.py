@@ -0,0 +1,113 @@
+import json
+import threading
+from collections import defaultdict
+
+import httpx
+from kivy.clock import Clock
+from kivy.logger import Logger
+from libs.applibs.generated_connection_manager import server_url
+
+
+class LiveUpdates:
+    """Listen to the server's /stream of changes and hand them to the screens.
+
+    The stream is read on a background thread. Every event is dispatched on
+    the Kivy clock, so callbacks run on the main thread and may touch widgets.
+    Callbacks are bound per channel ("messages", "teacher_messages", "files").
+    A "resync" callback fires after a reconnect or when the server dropped
+    events, and is the screen's cue to refetch its whole list once.
+    """
+
+    RETRY_DELAYS = (1, 2, 5, 10, 30)
+
+    def __init__(self, client):
+        self.client = client
+        self.callbacks = defaultdict(list)
+        self._thread = None
+        self._stop = threading.Event()
+        # open response per reader thread, keyed by that thread's stop event
+        self._responses = {}
+
+    def bind(self, channel, callback):
+        self.callbacks[channel].append(callback)
+        self._restart()
+
+    def unbind(self, channel, callback):
+        if callback in self.callbacks.get(channel, []):
+            self.callbacks[channel].remove(callback)
+            if not self.callbacks[channel]:
+                del self.callbacks[channel]
+        self._restart()
+
+    def _channels(self):
+        return sorted(channel for channel in self.callbacks if channel != "resync")
+
+    def _restart(self):
+        # the subscribed channels are part of the request, so reconnect
+        self.stop()
+        if self._channels():
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop, self._channels()), daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        response = self._responses.get(self._stop)
+        if response is not None:
+            # unblocks the reader thread; at the latest it notices the stop
+            # flag on the server's next heartbeat
+            response.close()
+
+    def _run(self, stop, channels):
+        attempt = 0
+        while not stop.is_set():
+            try:
+                with httpx.Client(cookies=self.client.cookies, timeout=None) as client:
+                    with client.stream(
+                        "GET",
+                        f"{server_url}/stream",
+                        params={"channels": ",".join(channels)},
+                    ) as response:
+                        if response.status_code != 200:
+                            Logger.warning(
+                                f"LiveUpdates: stream refused ({response.status_code})"
+                            )
+                            return
+                        self._responses[stop] = response
+                        if attempt:
+                            # anything sent while disconnected was missed
+                            self._dispatch("resync", {"channel": None})
+                        attempt = 0
+                        self._read(response, stop)
+            # StreamError: the response was closed under us by stop()
+            except (httpx.HTTPError, httpx.StreamError) as e:
+                if stop.is_set():
+                    return
+                Logger.info(f"LiveUpdates: stream interrupted ({e})")
+            finally:
+                self._responses.pop(stop, None)
+
+            delay = self.RETRY_DELAYS[min(attempt, len(self.RETRY_DELAYS) - 1)]
+            attempt += 1
+            stop.wait(delay)
+
+    def _read(self, response, stop):
+        channel, data = None, []
+        for line in response.iter_lines():
+            if stop.is_set():
+                return
+            if not line:
+                # a blank line ends the event
+                if channel and data:
+                    self._dispatch(channel, json.loads("\n".join(data)))
+                channel, data = None, []
+            elif line.startswith("event:"):
+                channel = line[len("event:") :].strip()
+            elif line.startswith("data:"):
+                data.append(line[len("data:") :].strip())
+
+    def _dispatch(self, channel, payload):
+        for callback in list(self.callbacks.get(channel, [])):
+            Clock.schedule_once(lambda dt, callback=callback: callback(payload))
@@ -1,5 +1,8 @@
+import hashlib
 import json
 import os
+import time
+from collections import OrderedDict
 
 import httpx
 
@@ -44,3 +47,196 @@ def save_cookies(cookies):
     cookies_dict = cookies_to_dict(cookies)
     with open(cookies_file, mode="w") as f:
         f.write(json.dumps(cookies_dict))
+
+
+# Follow next_cursor through a paginated list endpoint and collect every item
+def fetch_all_pages(fetch, **params):
+    items = []
+    while True:
+        response = fetch(params=params)
+        if response.status_code != 200:
+            return None
+
+        page = response.json()
+        items.extend(page["items"])
+        if page.get("next_cursor") is None:
+            return items
+        params["cursor"] = page["next_cursor"]
+
+
+# SHA-256 of a local file, read in chunks
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Send a file through a resumable upload session one chunk per request; after a
+# dropped connection ask the server how far it got and carry on from there
+def upload_resumable(routes, path, retries=5):
+    response = routes.post_upload_session(
+        json={
+            "filename": os.path.basename(path),
+            "size": os.path.getsize(path),
+            "sha256": file_sha256(path),
+        }
+    )
+    if response.status_code != 200:
+        return response
+
+    session = response.json()
+    if "file_id" in session:
+        # the server already has this content, nothing to send
+        return response
+    upload_id, offset = session["upload_id"], session["offset"]
+    failures = 0
+    with open(path, "rb") as f:
+        while True:
+            f.seek(offset)
+            chunk = f.read(session["chunk_size"])
+            try:
+                response = routes.put_upload_chunk(
+                    upload_id, params={"offset": offset}, content=chunk
+                )
+            except httpx.TransportError:
+                response = None
+
+            if response is not None and response.status_code == 200:
+                body = response.json()
+                if "file_id" in body:
+                    return response
+                offset, failures = body["offset"], 0
+                continue
+            if response is not None and response.status_code == 409:
+                # our offset was stale, the server tells us the right one
+                offset = response.json()["detail"]["offset"]
+                continue
+            if response is not None and response.status_code < 500:
+                return response
+
+            failures += 1
+            if failures > retries:
+                return response
+            time.sleep(min(2**failures, 30))
+            try:
+                status = routes.get_upload_session(upload_id)
+            except httpx.TransportError:
+                continue
+            if status.status_code != 200:
+                return status
+            offset = status.json()["offset"]
+
+
+# Stream a download to disk in chunks. Bytes land in "<path>.part" and the
+# server's ETag is kept in "<path>.etag": an interrupted download resumes with
+# a Range request (If-Range restarts it if the file changed meanwhile) and a
+# file that is already here is only revalidated
+def download_resumable(client, url, path, retries=3, chunk_size=64 * 1024):
+    partial, etag_file = f"{path}.part", f"{path}.etag"
+    for attempt in range(retries + 1):
+        etag = None
+        if os.path.exists(etag_file):
+            with open(etag_file) as f:
+                etag = f.read().strip() or None
+
+        headers = {}
+        if etag and os.path.exists(path):
+            headers["If-None-Match"] = etag
+        elif etag and os.path.exists(partial):
+            headers["Range"] = f"bytes={os.path.getsize(partial)}-"
+            headers["If-Range"] = etag
+
+        try:
+            with client.stream(
+                "GET", url, headers=headers, follow_redirects=True
+            ) as response:
+                if response.status_code == 304:
+                    return True
+                if response.status_code == 416:
+                    # the partial file is already complete or broken, start over
+                    os.remove(partial)
+                    continue
+                if response.status_code not in (200, 206):
+                    return False
+
+                with open(etag_file, "w") as f:
+                    f.write(response.headers.get("etag", ""))
+                # a 200 means a fresh copy, from the first byte
+                mode = "ab" if response.status_code == 206 else "wb"
+                with open(partial, mode) as f:
+                    for chunk in response.iter_bytes(chunk_size):
+                        f.write(chunk)
+            os.replace(partial, path)
+            return True
+        except httpx.TransportError:
+            time.sleep(min(2**attempt, 30))
+    return False
+
+
+# First "since" cursor for a sync endpoint: everything that was ever changed
+SYNC_EPOCH = "1970-01-01T00:00:00"
+
+
+# Apply a "since" sync response to records kept by id, returns the next cursor
+def merge_changes(records, changes, key="items"):
+    for item in changes.get(key, []):
+        records[item["id"]] = item
+    for deleted_id in changes.get("deleted", []):
+        records.pop(deleted_id, None)
+    return changes.get("next_since")
+
+
+# Remembers ETag'd JSON responses and revalidates them with If-None-Match;
+# a 304 from the server is handed to the caller as the remembered 200
+class ETagCachingTransport(httpx.HTTPTransport):
+    MAX_ENTRIES = 256
+    # describe the body as sent on the wire, not the decoded copy we keep
+    DECODED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = OrderedDict()
+
+    def handle_request(self, request):
+        if request.method != "GET":
+            return super().handle_request(request)
+
+        # the session cookie is part of the key so users never share entries
+        key = (str(request.url), request.headers.get("cookie"))
+        cached = self.responses.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+
+        response = super().handle_request(request)
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            self.responses.move_to_end(key)
+            return httpx.Response(
+                200, headers=cached[1], content=cached[2], request=request
+            )
+
+        etag = response.headers.get("etag")
+        content_type = response.headers.get("content-type", "")
+        if (
+            response.status_code == 200
+            and etag
+            and content_type.startswith("application/json")
+        ):
+            content = response.read()
+            # the body is kept decoded, so the replay must not claim gzip
+            headers = httpx.Headers(
+                [
+                    (name, value)
+                    for name, value in response.headers.multi_items()
+                    if name.lower() not in self.DECODED_HEADERS
+                ]
+            )
+            self.responses[key] = (etag, headers, content)
+            self.responses.move_to_end(key)
+            while len(self.responses) > self.MAX_ENTRIES:
+                self.responses.popitem(last=False)
+        else:
+            self.responses.pop(key, None)
+        return response
@@ -4,6 +4,7 @@ from kivy.properties import ListProperty, StringProperty
 from kivymd.uix.label import MDLabel
 from kivymd.uix.screen import MDScreen
 from libs.applibs.generated_connection_manager import ApplicationsRoutes
+from libs.applibs.utils import fetch_all_pages
 from libs.uix.baseclass.components.application_view_list import ApplicationViewListItem
 
 
@@ -39,18 +40,17 @@ class ApplicationsScreen(MDScreen):
 
     def get_all_applications(self):
         # Fetch applications from the server
-        response = ApplicationsRoutes(
-            client=self.manager.connection_client
-        ).get_applications()
+        applications = fetch_all_pages(
+            ApplicationsRoutes(client=self.manager.connection_client).get_applications
+        )
 
         # Stop the loading animation when response is received
         self.hide_loading()
 
-        if response.status_code != 200:
+        if applications is None:
             print("Failed to get Applications")
             return
 
-        applications = response.json()
         self.applications = applications
         # Cache the applications for future filtering
         self.manager.set_shared_data("cached_applications", applications)
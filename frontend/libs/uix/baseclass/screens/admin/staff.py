@@ -3,6 +3,7 @@ from kivy.clock import _default_time as time
 from kivy.properties import ListProperty
 from kivymd.uix.screen import MDScreen
 from libs.applibs.generated_connection_manager import StudentsRoutes
+from libs.applibs.utils import fetch_all_pages
 from libs.uix.baseclass.components.user_view_list import UserViewListItem
 
 
@@ -28,16 +29,17 @@ class UsersScreen(MDScreen):
 
     def get_all_students(self):
         # Fetch students from the server
-        response = StudentsRoutes(client=self.manager.connection_client).get_students()
+        students = fetch_all_pages(
+            StudentsRoutes(client=self.manager.connection_client).get_students
+        )
 
         # Stop the loading animation when response is received
         self.hide_loading()
 
-        if response.status_code != 200:
+        if students is None:
             print("Failed to get Users")
             return
 
-        students = response.json()
         self.students = students
         # Cache the students for future filtering
         self.manager.set_shared_data("cached_students", students)
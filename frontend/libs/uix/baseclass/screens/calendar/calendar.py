@@ -16,6 +16,7 @@ from kivymd.uix.label import MDLabel
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.textfield import MDTextField
 from libs.applibs.generated_connection_manager import EventsRoutes
+from libs.applibs.utils import SYNC_EPOCH, merge_changes
 
 
 class CalendarScreen(MDScreen):
@@ -26,6 +27,8 @@ class CalendarScreen(MDScreen):
     monthly_events = {}  # Dictionary to store monthly events
     selected_day_labels = []  # List to keep track of currently selected day labels
     currently_selected_date = None  # Store the currently selected date
+    event_records = {}  # Server events by id, kept in sync with the server
+    events_since = SYNC_EPOCH  # Cursor of the last events sync
 
     def __init__(self, **kwargs):
         super(CalendarScreen, self).__init__(**kwargs)
@@ -411,14 +414,28 @@ class CalendarScreen(MDScreen):
             dialog.dismiss()  # Close the dialog
 
     def get_all_events(self, *args):
-        """Fetch all events for the current month and populate the events dictionary."""
-        # Example: Fetch events from your API or database
-        response = EventsRoutes(self.manager.connection_client).get_events()
+        """Fetch the events changed since the last sync and merge them into the
+        events dictionary."""
+        response = EventsRoutes(self.manager.connection_client).get_events(
+            params={"since": self.events_since}
+        )
 
         if response and response.status_code == 200:
-            data = response.json()  # Assuming the response is in JSON format
+            changes = response.json()
+
+            # Take changed and deleted events out of their old date first
+            changed_ids = [event["id"] for event in changes["items"]]
+            for event_id in changed_ids + changes["deleted"]:
+                old_event = self.event_records.get(event_id)
+                if not old_event:
+                    continue
+                old_names = self.events.get(old_event.get("date"), [])
+                if old_event.get("name") in old_names:
+                    old_names.remove(old_event.get("name"))
+
+            self.events_since = merge_changes(self.event_records, changes)
 
-            for event in data:
+            for event in changes["items"]:
                 # Extract date and event description (this will depend on your data structure)
                 event_date_str = event.get("date")  # Format: 'YYYY-MM-DD'
                 event_name = event.get("name")  # Description of the event
@@ -1,7 +1,6 @@
 import json
 import os
 
-from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.properties import ObjectProperty
 from kivymd.uix.badge import MDBadge
@@ -9,13 +8,16 @@ from kivymd.uix.label import MDLabel
 from kivymd.uix.list import (
     MDListItem,
     MDListItemHeadlineText,
+    MDListItemLeadingAvatar,
     MDListItemLeadingIcon,
     MDListItemSupportingText,
 )
 from kivymd.uix.screen import MDScreen
 from libs.applibs.generated_connection_manager import (
     TeachersRoutes,  # Importing TeachersRoutes
+    server_url,
 )
+from libs.applibs.utils import SYNC_EPOCH, download_resumable, merge_changes
 
 
 class HomeworkScreen(MDScreen):
@@ -24,6 +26,8 @@ class HomeworkScreen(MDScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.documents = []
+        self.document_records = {}  # Documents by id, kept in sync with the server
+        self.documents_since = SYNC_EPOCH  # Cursor of the last sync
         self.current_open_document_id = (
             None  # Track the ID of the currently opened document
         )
@@ -31,8 +35,9 @@ class HomeworkScreen(MDScreen):
         self.load_badge_states()  # Load previous badge states from file
 
     def on_pre_enter(self):
-        """Schedule messages retrieval every 5 seconds."""
-        self._file_interval = Clock.schedule_interval(self.get_all_documents, 5)
+        """Subscribe to uploads pushed by the server instead of polling."""
+        self.manager.live_updates.bind("files", self.on_document_pushed)
+        self.manager.live_updates.bind("resync", self.get_all_documents)
 
     def on_enter(self):
         """Populate documents when the screen is entered."""
@@ -42,9 +47,10 @@ class HomeworkScreen(MDScreen):
         """Fetch all documents from the server."""
         try:
             # Call the API to fetch the document list
+            # Only the documents changed since the last sync are sent
             response = TeachersRoutes(
                 client=self.manager.connection_client
-            ).list_files_teacher_list__get()
+            ).list_files_teacher_list__get(params={"since": self.documents_since})
 
             # Ensure a successful HTTP response
             if response.status_code != 200:
@@ -59,7 +65,10 @@ class HomeworkScreen(MDScreen):
 
             # Ensure the response contains a valid 'files' list
             if isinstance(all_documents, dict) and "files" in all_documents:
-                self.documents = all_documents["files"]
+                self.documents_since = merge_changes(
+                    self.document_records, all_documents, key="files"
+                )
+                self.documents = list(self.document_records.values())
                 self.populate_all_documents()
             else:
                 print("Unexpected response format:", all_documents)
@@ -70,6 +79,17 @@ class HomeworkScreen(MDScreen):
                 "Error retrieving documents. Please check your connection."
             )
 
+    def on_leave(self):
+        self.manager.live_updates.unbind("files", self.on_document_pushed)
+        self.manager.live_updates.unbind("resync", self.get_all_documents)
+
+    def on_document_pushed(self, file):
+        """Add a newly uploaded document without refetching the list."""
+        if file.get("id") not in self.document_records:
+            self.document_records[file.get("id")] = file
+            self.documents = list(self.document_records.values())
+            self.populate_all_documents()
+
     def populate_all_documents(self):
         """Populate the MDList with the fetched documents."""
         self.ids.posts.clear_widgets()
@@ -104,7 +124,8 @@ class HomeworkScreen(MDScreen):
 
                 # Define on-click behavior for the list item
                 def on_document_click(instance, file=file):
-                    self.check_and_download(file["filename"])  # Check and download
+                    # Check and download
+                    self.check_and_download(file["filename"], file.get("id"))
                     self.current_open_document_id = file.get("id")
                     self.badge_states[file.get("id")] = "read"  # Mark as read
                     self.save_badge_states()
@@ -112,9 +133,7 @@ class HomeworkScreen(MDScreen):
 
                 # Create a list item
                 list_item = MDListItem(
-                    MDListItemLeadingIcon(
-                        icon="file-document",  # Icon for documents
-                    ),
+                    self.document_preview(file),
                     MDListItemHeadlineText(
                         text=f"From: {self.first_name}",  # Example text
                     ),
@@ -131,27 +150,28 @@ class HomeworkScreen(MDScreen):
                 # Add the list item to the MDList
                 self.ids.posts.add_widget(list_item)
 
-    def download_file_teacher_download__filename__get(self, filename, **kwargs):
-        """Download the file from the server."""
-        try:
-            response = TeachersRoutes(
-                client=self.manager.connection_client
-            ).download_file_teacher_download__filename__get(filename, **kwargs)
-            return response
-        except Exception as e:
-            print(f"Error downloading file: {e}")
-            return None
-
-    def check_and_download(self, filename):
-        """Check if the file exists on the server and download it."""
-        response = self.download_file_teacher_download__filename__get(filename)
-        if response and response.status_code == 200:
-            # Save the file locally
-            download_dir = "downloads"
-            os.makedirs(download_dir, exist_ok=True)
-            file_path = os.path.join(download_dir, filename)
-            with open(file_path, "wb") as f:
-                f.write(response.content)
+    def document_preview(self, file):
+        """A small server-made thumbnail for images and videos, an icon otherwise."""
+        media_type = file.get("media_type") or ""
+        if media_type.startswith(("image/", "video/")):
+            return MDListItemLeadingAvatar(
+                source=f"{server_url}/teacher/files/{file['id']}/thumbnail",
+            )
+        return MDListItemLeadingIcon(
+            icon="file-document",  # Icon for documents
+        )
+
+    def check_and_download(self, filename, file_id=None):
+        """Download the file from the server, streaming it to disk."""
+        download_dir = "downloads"
+        os.makedirs(download_dir, exist_ok=True)
+        file_path = os.path.join(download_dir, filename)
+        if download_resumable(
+            self.manager.connection_client,
+            f"{server_url}/teacher/download/{filename}"
+            + (f"?file_id={file_id}" if file_id is not None else ""),
+            file_path,
+        ):
             print(f"File downloaded successfully: {file_path}")
         else:
             print(f"File not found on the server: {filename}")
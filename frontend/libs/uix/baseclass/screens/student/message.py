@@ -1,7 +1,6 @@
 import json
 import os
 
-from kivy.clock import Clock
 from kivy.metrics import dp
 from kivymd.uix.badge import MDBadge
 from kivymd.uix.label import MDLabel
@@ -13,19 +12,24 @@ from kivymd.uix.list import (
 )
 from kivymd.uix.screen import MDScreen
 from libs.applibs.generated_connection_manager import MessagesRoutes
+from libs.applibs.utils import SYNC_EPOCH, merge_changes
 
 
 class StudentMessageScreen(MDScreen):
     def __init__(self, **kwargs):
         super(StudentMessageScreen, self).__init__(**kwargs)
         self.messages = []
+        self.message_records = {}  # Messages by id, kept in sync with the server
+        self.messages_since = SYNC_EPOCH  # Cursor of the last sync
         self.current_open_message_id = None  # Track the ID of the currently opened message
         self.badge_states = {}  # Track the read/unread status of messages
         self.load_badge_states()  # Load previous badge states from file
 
     def on_pre_enter(self):
-        # Schedule messages retrieval every 5 seconds
-        self._message_interval = Clock.schedule_interval(self.get_all_messages, 5)
+        # Fetch the list once, then let the server push changes as they happen
+        self.get_all_messages()
+        self.manager.live_updates.bind("messages", self.on_message_pushed)
+        self.manager.live_updates.bind("resync", self.get_all_messages)
 
     def on_enter(self):
         # Populate the list and load badge states
@@ -33,18 +37,32 @@ class StudentMessageScreen(MDScreen):
 
     def get_all_messages(self, dt=None):
         try:
+            # Only the messages changed since the last sync are sent
             response = MessagesRoutes(
                 client=self.manager.connection_client
-            ).get_messages()
-            new_messages = response.json()
+            ).get_messages(params={"since": self.messages_since})
+            if response.status_code != 200:
+                return
 
-            if new_messages != self.messages:
-                self.messages = new_messages
-                self.populate_all_messages()
+            changes = response.json()
+            self.messages_since = merge_changes(self.message_records, changes)
+            if changes["items"] or changes["deleted"]:
+                self.refresh_messages()
 
         except Exception as e:
             print(f"Error fetching messages: {e}")
 
+    def on_message_pushed(self, message):
+        if message.get("is_deleted"):
+            self.message_records.pop(message.get("id"), None)
+        else:
+            self.message_records[message.get("id")] = message
+        self.refresh_messages()
+
+    def refresh_messages(self):
+        self.messages = sorted(self.message_records.values(), key=lambda m: m["id"])
+        self.populate_all_messages()
+
     def populate_all_messages(self):
         self.ids.posts.clear_widgets()
 
@@ -104,8 +122,8 @@ class StudentMessageScreen(MDScreen):
     def on_leave(self):
         # Update badge status when leaving the screen
         self.change_icon(0)
-        if hasattr(self, "_message_interval"):
-            self._message_interval.cancel()
+        self.manager.live_updates.unbind("messages", self.on_message_pushed)
+        self.manager.live_updates.unbind("resync", self.get_all_messages)
 
     def load_badge_states(self):
         """Load the badge (read/unread) states from a file."""
@@ -17,6 +17,22 @@ class TeacherChatScreen(MDScreen):
         super().__init__(*args, **kwargs)
         self.messages = []  # Store messages here if needed
 
+    def on_pre_enter(self):
+        # Admin replies are pushed by the server as soon as they are saved
+        self.manager.live_updates.bind("teacher_messages", self.on_message_pushed)
+
+    def on_leave(self):
+        self.manager.live_updates.unbind("teacher_messages", self.on_message_pushed)
+
+    def on_message_pushed(self, message: dict):
+        user_data = self.manager.get_shared_data("user")
+        if (
+            user_data
+            and message.get("sender") == "admin"
+            and str(message.get("teacher_id")) == str(user_data.get("id"))
+        ):
+            self.update_ui(message=message.get("content", ""), success=True)
+
     def send_message(self, message: str):
         user_data = self.manager.get_shared_data("user")
         if user_data:
@@ -14,6 +14,7 @@ from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 from libs.applibs.generated_connection_manager import (
     TeachersRoutes,  # Importing TeachersRoutes
 )
+from libs.applibs.utils import upload_resumable
 
 
 class SendHomework(MDScreen):
@@ -124,40 +125,29 @@ class SendHomework(MDScreen):
             ).open()
             return
 
-        # Use TeachersRoutes to upload the file
+        # Upload in chunks so a dropped connection resumes instead of restarting
+        response = upload_resumable(
+            TeachersRoutes(client=self.manager.connection_client), self.selected_file
+        )
 
-        with open(self.selected_file, "rb") as file:
-            data = {
-                "file": (
-                    os.path.basename(self.selected_file),
-                    file,
-                    "application/octet-stream",
+        if response is not None and response.status_code == 200:
+            MDSnackbar(
+                MDSnackbarText(
+                    text="File uploaded successfully.",
                 ),
-            }
-
-            # Call the method from TeachersRoutes to upload the file
-            response = TeachersRoutes(
-                client=self.manager.connection_client
-            ).upload_file_teacher_upload__post(files=data)
-
-            if response.status_code == 200:
-                MDSnackbar(
-                    MDSnackbarText(
-                        text="File uploaded successfully.",
-                    ),
-                    y=dp(24),
-                    pos_hint={"center_x": 0.5},
-                    size_hint_x=0.8,
-                ).open()
-            else:
-                MDSnackbar(
-                    MDSnackbarText(
-                        text="Failed to upload file.",
-                    ),
-                    y=dp(24),
-                    pos_hint={"center_x": 0.5},
-                    size_hint_x=0.8,
-                ).open()
+                y=dp(24),
+                pos_hint={"center_x": 0.5},
+                size_hint_x=0.8,
+            ).open()
+        else:
+            MDSnackbar(
+                MDSnackbarText(
+                    text="Failed to upload file.",
+                ),
+                y=dp(24),
+                pos_hint={"center_x": 0.5},
+                size_hint_x=0.8,
+            ).open()
         Clock.schedule_once(self.switch_to_next_screen, 4)
 
     def switch_to_next_screen(self, dt=None):
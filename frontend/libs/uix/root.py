@@ -8,6 +8,7 @@ from kivy.properties import DictProperty
 from kivymd.uix.screenmanager import MDScreenManager
 from libs.applibs import utils
 from libs.applibs.generated_connection_manager import create_client
+from libs.applibs.live_updates import LiveUpdates
 
 
 class Root(MDScreenManager):
@@ -23,6 +24,8 @@ class Root(MDScreenManager):
         try:
             # Create a connection client
             self.connection_client = create_client()
+            # server pushes shared by every screen, see libs/applibs/live_updates.py
+            self.live_updates = LiveUpdates(self.connection_client)
             # Load the screens data
             with open(utils.abs_path("screens.json")) as f:
                 self.screens_data = json.load(f)
@@ -0,0 +1,41 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from libs.applibs.utils import ETagCachingTransport  # noqa: E402
+
+
+def test_etag_replay_of_gzip_encoded_json(monkeypatch):
+    body = json.dumps({"items": [1, 2, 3]}).encode()
+    seen = []
+
+    def handle_request(self, request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == 'W/"v1"':
+            return httpx.Response(304, headers={"etag": 'W/"v1"'})
+        compressed = gzip.compress(body)
+        return httpx.Response(
+            200,
+            headers={
+                "etag": 'W/"v1"',
+                "content-type": "application/json",
+                "content-encoding": "gzip",
+                "content-length": str(len(compressed)),
+            },
+            content=compressed,
+        )
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+
+    with httpx.Client(transport=ETagCachingTransport()) as client:
+        first = client.get("http://testserver/message/")
+        second = client.get("http://testserver/message/")
+
+    assert seen == [None, 'W/"v1"']
+    assert first.json() == second.json() == {"items": [1, 2, 3]}
+    assert second.status_code == 200